@@ -1,28 +1,91 @@
 import os
 import re
+import platform
+import logging
+import logging.handlers
+import multiprocessing
+import concurrent.futures
 import PyPDF2
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Set, Tuple
 from docx2pdf import convert
+from docx2pdf_converter import WordBatch, convert_with_libreoffice
 
-def convert_word_to_pdf(word_path: str) -> Optional[str]:
+# Word's COM errors (crashed or unresponsive instance); pywin32 only exists on Windows
+try:
+    from pywintypes import com_error
+except ImportError:
+    class com_error(Exception):
+        pass
+
+log = logging.getLogger(__name__)
+
+# Use RE2's linear-time DFA engine for the ID scan if it is installed
+try:
+    import re2 as _pid_regex
+except ImportError:
+    _pid_regex = re
+
+# World Bank project IDs: P followed by 6 digits (e.g., P123456)
+_PID_RE = _pid_regex.compile(r'P\d{6}')
+# Names this script produces: the project ID, optionally with a duplicate counter
+_CANONICAL_NAME_RE = _pid_regex.compile(r'P\d{6}(?:_\d+)?')
+# Same pattern for scanning raw page content streams
+_PID_RE_BYTES = _pid_regex.compile(rb'P\d{6}')
+
+def convert_word_to_pdf(word_path: str, word_batch: Optional[WordBatch] = None) -> Optional[str]:
     """
     Convert a Word document (.doc or .docx) to PDF format.
     
     Args:
         word_path: Path to the Word document
+        word_batch: Running Word instance to reuse; falls back to docx2pdf if None,
+            and to LibreOffice if Word could not be started
         
     Returns:
         Path to the converted PDF file if successful, None otherwise
     """
     try:
         pdf_path = str(Path(word_path).with_suffix('.pdf'))
-        convert(word_path, pdf_path)
+        if word_batch is None:
+            convert(word_path, pdf_path)
+        elif word_batch.word is None:
+            convert_with_libreoffice(word_path, pdf_path)
+        else:
+            try:
+                word_batch.convert(word_path, pdf_path)
+            except com_error as e:
+                # Word crashed or stopped answering; restart it once and retry this file
+                log.warning(f"Word failed on {word_path}, restarting it: {str(e)}")
+                word_batch.__exit__(None, None, None)
+                word_batch.__enter__()
+                word_batch.convert(word_path, pdf_path)
         return pdf_path
     except Exception as e:
-        print(f"Error converting {word_path} to PDF: {str(e)}")
+        log.error(f"Error converting {word_path} to PDF: {str(e)}")
         return None
 
+def _scan_content_stream(page) -> Optional[str]:
+    """
+    Look for a project ID in a page's decoded content stream,
+    without running PyPDF2's text layout.
+    
+    Args:
+        page: PyPDF2 page object to scan
+        
+    Returns:
+        The project ID if found, None otherwise
+    """
+    try:
+        contents = page.get_contents()
+        if contents is None:
+            return None
+        match = _PID_RE_BYTES.search(contents.get_data())
+    except Exception:
+        return None
+    return match.group(0).decode('ascii') if match else None
+
 def extract_project_id(pdf_path: str, max_pages: int = 10) -> Optional[str]:
     """
     Extract the first occurrence of a World Bank project ID from a PDF file.
@@ -37,30 +100,58 @@ def extract_project_id(pdf_path: str, max_pages: int = 10) -> Optional[str]:
     """
     try:
         with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            # Limit the number of pages to search
-            pages_to_search = min(len(reader.pages), max_pages)
-            
-            # Regular expression pattern for project ID
-            pattern = r'P\d{6}'
+            # Lenient parsing; pages are resolved lazily so large PDFs are not fully loaded
+            reader = PyPDF2.PdfReader(file, strict=False)
             
-            # Search through pages
-            for page_num in range(pages_to_search):
-                page = reader.pages[page_num]
-                text = page.extract_text()
+            # Pages are searched in order so the first occurrence wins; most IDs are on page 1
+            for page in islice(reader.pages, max_pages):
+                # The ID is usually literal text in the content stream, so try that first
+                project_id = _scan_content_stream(page)
+                if project_id:
+                    return project_id
+                
+                # Fall back to full text extraction (e.g. glyphs mapped through custom CMaps)
+                text = page.extract_text() or ""
                 
-                # Find all matches in the page
-                matches = re.findall(pattern, text)
-                if matches:
-                    return matches[0]  # Return the first match
+                # Stop at the first match in the page
+                match = _PID_RE.search(text)
+                if match:
+                    return match.group(0)
                     
         return None
         
     except Exception as e:
-        print(f"Error processing {pdf_path}: {str(e)}")
+        log.error(f"Error processing {pdf_path}: {str(e)}")
         return None
 
-def process_and_rename_document(doc_path: Path, folder: Path) -> bool:
+def _init_worker_logging(log_queue) -> None:
+    """
+    Route a worker process's log records to the parent through a queue,
+    so workers don't contend for stdout.
+    
+    Args:
+        log_queue: Queue drained by a QueueListener in the parent process
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+def _scan_one(doc_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Extract the project ID from a single PDF in a worker process.
+    Only reads the file, so it is safe to run in parallel.
+    
+    Args:
+        doc_path: Path to the PDF file
+        
+    Returns:
+        Tuple of (document path, project ID or None)
+    """
+    return doc_path, extract_project_id(doc_path)
+
+def process_and_rename_document(doc_path: Path, folder: Path, project_id: Optional[str] = None,
+                                word_batch: Optional[WordBatch] = None,
+                                existing: Optional[Set[str]] = None) -> bool:
     """
     Process a document (PDF or Word) and rename it based on project ID.
     For Word documents, converts to PDF and removes the original.
@@ -68,59 +159,91 @@ def process_and_rename_document(doc_path: Path, folder: Path) -> bool:
     Args:
         doc_path: Path to the document
         folder: Path to the parent folder
+        project_id: Project ID already extracted from the PDF, if known
+        word_batch: Running Word instance to reuse for conversions
+        existing: Names of the files currently in the folder; kept up to date on rename
         
     Returns:
         True if successfully processed and renamed, False otherwise
     """
     pdf_path = str(doc_path)
+    if existing is None:
+        existing = {entry.name for entry in os.scandir(folder)}
     is_word = doc_path.suffix.lower() in ['.doc', '.docx']
     converted_pdf = None
     
     try:
         # Convert Word documents to PDF
         if is_word:
-            print(f"Converting Word document: {doc_path.name}")
-            converted_pdf = convert_word_to_pdf(str(doc_path))
+            log.info(f"Converting Word document: {doc_path.name}")
+            converted_pdf = convert_word_to_pdf(pdf_path, word_batch)
             if not converted_pdf:
                 return False
             pdf_path = converted_pdf
         
-        # Extract project ID
-        project_id = extract_project_id(pdf_path)
+        # Trust a project ID already in a PDF's filename and skip parsing it
+        if project_id is None and not is_word:
+            match = _PID_RE.search(doc_path.stem)
+            if match:
+                project_id = match.group(0)
+        
+        # Extract project ID unless it was already scanned
+        if project_id is None:
+            project_id = extract_project_id(pdf_path)
         
         if project_id:
             # Create new filename with project ID (always .pdf)
             new_filename = f"{project_id}.pdf"
-            new_path = folder / new_filename
             
-            # Handle duplicate filenames
+            # Nothing to do for a PDF that is already named after its project ID
+            if not is_word and doc_path.name == new_filename:
+                log.info(f"Already named: {doc_path.name}")
+                return True
+            
+            # Handle duplicate filenames against the in-memory listing
             counter = 1
-            while new_path.exists():
+            reserved = False
+            while new_filename in existing:
                 new_filename = f"{project_id}_{counter}.pdf"
-                new_path = folder / new_filename
                 counter += 1
+                if new_filename not in existing:
+                    # Claim the suffixed name atomically in case it appeared since the listing
+                    try:
+                        os.close(os.open(folder / new_filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                        reserved = True
+                    except FileExistsError:
+                        existing.add(new_filename)
+            new_path = folder / new_filename
+            
+            # os.replace is a single atomic rename onto the chosen (or reserved) name
+            try:
+                os.replace(converted_pdf if is_word else doc_path, new_path)
+            except OSError:
+                if reserved:
+                    new_path.unlink()
+                raise
             
             if is_word:
-                # For Word documents, move the converted PDF to the new name
-                Path(converted_pdf).rename(new_path)
+                # For Word documents, the converted PDF was moved to the new name
                 # Delete the original Word document
                 doc_path.unlink()
-                print(f"Converted and renamed: {doc_path.name} -> {new_filename}")
+                log.info(f"Converted and renamed: {doc_path.name} -> {new_filename}")
             else:
-                # For PDFs, just rename
-                doc_path.rename(new_path)
-                print(f"Renamed: {doc_path.name} -> {new_filename}")
+                # For PDFs, the file itself was renamed
+                log.info(f"Renamed: {doc_path.name} -> {new_filename}")
             
+            existing.discard(doc_path.name)
+            existing.add(new_filename)
             return True
         else:
-            print(f"No project ID found in: {doc_path.name}")
+            log.info(f"No project ID found in: {doc_path.name}")
             # If this was a Word doc conversion with no project ID, clean up the PDF
             if converted_pdf:
                 Path(converted_pdf).unlink()
             return False
             
     except Exception as e:
-        print(f"Error processing {doc_path.name}: {str(e)}")
+        log.error(f"Error processing {doc_path.name}: {str(e)}")
         # Clean up converted PDF if it exists
         if converted_pdf:
             try:
@@ -146,16 +269,82 @@ def rename_documents_with_project_ids(folder_path: str) -> Tuple[int, int]:
         raise ValueError(f"Folder not found: {folder_path}")
     
     successful_processes = 0
-    total_docs = 0
     
-    # Process all PDF and Word files in the folder
-    for pattern in ['*.pdf', '*.doc', '*.docx']:
-        for doc_file in folder.glob(pattern):
-            total_docs += 1
-            print(f"\nProcessing: {doc_file.name}")
+    # List the folder once: every name for duplicate checks, PDF and Word files to process
+    existing = set()
+    docs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            existing.add(entry.name)
+            if entry.is_file() and entry.name.lower().endswith(('.pdf', '.doc', '.docx')):
+                docs.append(Path(entry.path))
+    total_docs = len(docs)
+    
+    # PDFs already named by a previous run need no parsing or renaming
+    pending = []
+    for doc_file in docs:
+        if doc_file.suffix.lower() == '.pdf' and _CANONICAL_NAME_RE.fullmatch(doc_file.stem):
+            successful_processes += 1
+        else:
+            pending.append(doc_file)
+    docs = pending
+    
+    # Scan PDFs for project IDs in parallel; Word conversion stays serial
+    # because docx2pdf drives Word over COM, which is not fork-safe
+    pdf_files = [doc_file for doc_file in docs if doc_file.suffix.lower() == '.pdf']
+    scanned_ids = {}
+    pdf_paths = []
+    for doc_file in pdf_files:
+        # PDFs whose filename already carries a project ID don't need parsing
+        match = _PID_RE.search(doc_file.stem)
+        if match:
+            scanned_ids[str(doc_file)] = match.group(0)
+        else:
+            pdf_paths.append(str(doc_file))
+    if pdf_paths:
+        max_workers = min(os.cpu_count() or 1, 8)
+        # A single listener thread writes out the workers' log records
+        log_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+        listener.start()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                        initializer=_init_worker_logging,
+                                                        initargs=(log_queue,)) as executor:
+                for doc_path, project_id in executor.map(_scan_one, pdf_paths):
+                    scanned_ids[doc_path] = project_id
+        finally:
+            listener.stop()
+    
+    # Start Word once for the whole folder instead of once per document
+    word_batch = None
+    has_word_docs = len(pdf_files) < len(docs)
+    if has_word_docs and platform.system() == "Windows":
+        word_batch = WordBatch()
+        try:
+            word_batch.__enter__()
+        except Exception as e:
+            # The batch stays without a Word instance, so LibreOffice converts instead
+            log.warning(f"Could not start Microsoft Word, converting with LibreOffice: {str(e)}")
+    
+    # Rename serially so duplicate-name handling stays race-free
+    try:
+        for doc_file in docs:
+            log.info(f"\nProcessing: {doc_file.name}")
             
-            if process_and_rename_document(doc_file, folder):
+            if doc_file.suffix.lower() == '.pdf':
+                project_id = scanned_ids.get(str(doc_file))
+                if not project_id:
+                    log.info(f"No project ID found in: {doc_file.name}")
+                    continue
+            else:
+                project_id = None
+            
+            if process_and_rename_document(doc_file, folder, project_id, word_batch, existing):
                 successful_processes += 1
+    finally:
+        if word_batch is not None and word_batch.word is not None:
+            word_batch.__exit__(None, None, None)
     
     return successful_processes, total_docs
 
@@ -163,6 +352,13 @@ def main():
     """
     Main function to run the document renaming script.
     """
+    # Per-file progress goes through logging rather than print
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    
     # Get folder path from user and remove any quotes
     folder_path = input("Enter the folder path containing PDF and Word files: ").strip().strip('"\'').strip()
     
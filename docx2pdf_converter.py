@@ -2,48 +2,75 @@
 import os
 import time
 import argparse
-import concurrent.futures
+import multiprocessing
+import multiprocessing.util
+from functools import partial
 from pathlib import Path
 import platform
+import shutil
 import subprocess
+import tempfile
+from uuid import uuid4
 from tqdm import tqdm
 
-def convert_with_libreoffice(input_file, output_file=None):
-    """Convert docx to PDF using LibreOffice in headless mode"""
-    if output_file is None:
-        output_file = str(Path(input_file).with_suffix('.pdf'))
-    
-    # Determine LibreOffice executable based on platform
-    if platform.system() == "Windows":
+# Number of files handed to a single LibreOffice invocation
+LIBREOFFICE_CHUNK_SIZE = 50
+
+_IS_WINDOWS = platform.system() == "Windows"
+
+def _resolve_soffice():
+    """Determine the LibreOffice executable based on platform"""
+    if _IS_WINDOWS:
         # Possible paths for LibreOffice on Windows
         libreoffice_paths = [
             r"C:\Program Files\LibreOffice\program\soffice.exe",
             r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
         ]
-        soffice = next((p for p in libreoffice_paths if os.path.exists(p)), None)
+        return next((p for p in libreoffice_paths if os.path.exists(p)), None)
     elif platform.system() == "Darwin":  # macOS
-        soffice = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+        return "/Applications/LibreOffice.app/Contents/MacOS/soffice"
     else:  # Linux and others
-        soffice = "libreoffice"
+        return "libreoffice"
+
+# Resolved once at import instead of on every conversion
+_SOFFICE = _resolve_soffice()
+_TEMP_DIR = tempfile.gettempdir()
+
+# Microsoft Word type library (GUID, LCID, major, minor version)
+WORD_TYPELIB = ('{00020905-0000-0000-C000-000000000046}', 0, 8, 5)
+
+# Generate Word's COM wrappers once so Dispatch returns early-bound objects
+# instead of looking up every method and property by name at runtime
+if _IS_WINDOWS:
+    try:
+        import win32com.client
+        win32com.client.gencache.EnsureModule(*WORD_TYPELIB)
+    except Exception:
+        print("Warning: Could not load Word type library, using late-bound COM calls")
+
+def convert_with_libreoffice(input_file, output_file=None):
+    """Convert docx to PDF using LibreOffice in headless mode"""
+    if output_file is None:
+        output_file = str(Path(input_file).with_suffix('.pdf'))
     
-    if not soffice:
+    if not _SOFFICE:
         raise Exception("LibreOffice executable not found")
     
     output_dir = os.path.dirname(output_file) or '.'
     
     args = [
-        soffice,
+        _SOFFICE,
         "--headless",
         "--convert-to", "pdf",
         "--outdir", output_dir,
         input_file
     ]
     
-    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate()
+    # Only stderr is needed, to explain failures
+    process = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
     
     if process.returncode != 0:
-        raise Exception(f"LibreOffice conversion failed: {stderr.decode()}")
+        raise Exception(f"LibreOffice conversion failed: {process.stderr.decode()}")
     # LibreOffice creates the PDF with the same name as the input file but with .pdf extension
     default_output = str(Path(os.path.join(output_dir, Path(input_file).stem)).with_suffix('.pdf'))
     
@@ -53,135 +80,229 @@ def convert_with_libreoffice(input_file, output_file=None):
     
     return output_file
 
-def convert_with_word(input_file, output_file=None, retries=2, timeout=30):
-    """Convert docx to PDF using Microsoft Word (Windows only)"""
-    if output_file is None:
-        output_file = str(Path(input_file).with_suffix('.pdf'))
-    
-    # Only import win32com if we're using this function
-    import win32com.client
-    import pythoncom
-    import comtypes.client
-    import time
-    import threading
+def convert_many_with_libreoffice(input_files, output_dir):
+    """
+    Convert several docx files to PDF with a single LibreOffice invocation.
+    Returns the input files whose PDF was not produced.
+    """
+    if not _SOFFICE:
+        raise Exception("LibreOffice executable not found")
     
-    # Remove the SIGALRM timeout as it doesn't work on Windows
-    # Instead, use a threading-based timeout approach
+    # Convert into a fresh scratch folder so a PDF left over from an earlier run
+    # can't be mistaken for one this invocation produced
+    with tempfile.TemporaryDirectory(dir=output_dir) as scratch_dir:
+        args = [
+            _SOFFICE,
+            "--headless",
+            "--convert-to", "pdf",
+            "--outdir", scratch_dir,
+            *input_files
+        ]
+        
+        process = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+        
+        if process.returncode != 0:
+            print(f"  LibreOffice batch conversion failed: {process.stderr.decode()}")
+            return list(input_files)
+        
+        # LibreOffice names each PDF after its input file
+        missed = []
+        for input_file in input_files:
+            pdf_name = Path(input_file).stem + ".pdf"
+            converted = os.path.join(scratch_dir, pdf_name)
+            if os.path.exists(converted):
+                shutil.move(converted, os.path.join(output_dir, pdf_name))
+            else:
+                missed.append(input_file)
+        return missed
+
+def _word_pid(word):
+    """Find the process ID of a Word instance, or None if it can't be determined"""
+    try:
+        import win32gui
+        import win32process
+        
+        # Give the hidden main window a unique title so it can be found
+        caption = f"esf_{os.getpid()}_{uuid4().hex}"
+        word.Caption = caption
+        hwnd = win32gui.FindWindow("OpusApp", caption)
+        return win32process.GetWindowThreadProcessId(hwnd)[1] if hwnd else None
+    except Exception:
+        return None
+
+class WordBatch:
+    """Keep one Microsoft Word instance alive across many conversions (Windows only)"""
     
-    # Initialize COM in this thread
-    pythoncom.CoInitialize()
+    def __init__(self):
+        self.word = None
+        self.pid = None
     
-    for attempt in range(retries + 1):
-        word = None
+    def __enter__(self):
+        # Only import win32com if we're using Word
+        import win32com.client
+        import pythoncom
+        
+        # Initialize COM in this thread
+        pythoncom.CoInitialize()
+        
         try:
-            word = win32com.client.DispatchEx("Word.Application")
-            word.Visible = False
-            word.DisplayAlerts = 0  # Don't show alerts
+            self.word = win32com.client.DispatchEx("Word.Application")
+            self.word.Visible = False
+            self.word.DisplayAlerts = 0  # Don't show alerts
             
             # Set these additional properties for corporate environments
-            word.Options.CheckGrammarAsYouType = False
-            word.Options.CheckSpellingAsYouType = False
-            
-            # For OneDrive files, use a more robust approach
-            if "OneDrive" in input_file:
-                # Try different opening methods in case of issues
+            self.word.Options.CheckGrammarAsYouType = False
+            self.word.Options.CheckSpellingAsYouType = False
+            self.pid = _word_pid(self.word)
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        
+        return self
+    
+    def convert(self, input_file, output_file=None):
+        """Convert a single doc/docx to PDF with the running Word instance"""
+        if output_file is None:
+            output_file = str(Path(input_file).with_suffix('.pdf'))
+        
+        # Resolve both paths once; Word needs absolute paths
+        abs_in = os.path.abspath(input_file)
+        abs_out = os.path.abspath(output_file)
+        word = self.word
+        
+        # For OneDrive files, use a more robust approach
+        if "OneDrive" in input_file:
+            # Try different opening methods in case of issues
+            try:
+                # Method 1: Open with ReadOnly flag to avoid lock issues
+                doc = word.Documents.Open(
+                    abs_in, 
+                    ReadOnly=True,
+                    AddToRecentFiles=False,
+                    Visible=False
+                )
+                
+                # Try export method instead of SaveAs for OneDrive files
+                doc.ExportAsFixedFormat(
+                    OutputFileName=abs_out,
+                    ExportFormat=17,  # wdExportFormatPDF
+                    OpenAfterExport=False,
+                    OptimizeFor=0,    # wdExportOptimizeForPrint
+                    CreateBookmarks=1,  # wdExportCreateHeadingBookmarks
+                    DocStructureTags=True
+                )
+                doc.Close(SaveChanges=False)
+                
+            except Exception as e:
+                # If the first method fails, try a different approach
+                print(f"  First OneDrive method failed: {str(e)}")
+                print("  Trying alternative method...")
+                
+                # Force close any open documents
                 try:
-                    # Method 1: Open with ReadOnly flag to avoid lock issues
-                    doc = word.Documents.Open(
-                        os.path.abspath(input_file), 
-                        ReadOnly=True,
-                        AddToRecentFiles=False,
-                        Visible=False
-                    )
-                    
-                    # Try export method instead of SaveAs for OneDrive files
-                    doc.ExportAsFixedFormat(
-                        OutputFileName=os.path.abspath(output_file),
-                        ExportFormat=17,  # wdExportFormatPDF
-                        OpenAfterExport=False,
-                        OptimizeFor=0,    # wdExportOptimizeForPrint
-                        CreateBookmarks=1,  # wdExportCreateHeadingBookmarks
-                        DocStructureTags=True
-                    )
-                    doc.Close(SaveChanges=False)
-                    
-                except Exception as e:
-                    # If the first method fails, try a different approach
-                    print(f"  First OneDrive method failed: {str(e)}")
-                    print("  Trying alternative method...")
+                    for doc in word.Documents:
+                        doc.Close(SaveChanges=False)
+                except:
+                    pass
+                
+                # Method 2: Copy the file to temp directory first
+                # (pid + uuid keep names unique across parallel workers)
+                temp_file = os.path.join(_TEMP_DIR, f"esf_{os.getpid()}_{uuid4().hex}_{os.path.basename(input_file)}")
+                
+                try:
+                    # Copy to temp location
+                    shutil.copy2(input_file, temp_file)
                     
-                    # Force close any open documents
+                    # Try with the temp file
+                    doc = word.Documents.Open(temp_file)
+                    doc.SaveAs(abs_out, FileFormat=17)
+                    doc.Close()
+                except Exception as temp_error:
+                    raise Exception(f"Both OneDrive methods failed: {str(temp_error)}")
+                finally:
+                    # Clean up temp file even if the conversion failed
                     try:
-                        for doc in word.Documents:
-                            doc.Close(SaveChanges=False)
-                    except:
+                        os.unlink(temp_file)
+                    except OSError:
                         pass
-                    
-                    # Method 2: Copy the file to temp directory first
-                    import tempfile
-                    import shutil
-                    
-                    temp_dir = tempfile.gettempdir()
-                    temp_file = os.path.join(temp_dir, f"temp_{os.path.basename(input_file)}")
-                    
-                    try:
-                        # Copy to temp location
-                        shutil.copy2(input_file, temp_file)
-                        
-                        # Try with the temp file
-                        doc = word.Documents.Open(temp_file)
-                        doc.SaveAs(os.path.abspath(output_file), FileFormat=17)
-                        doc.Close()
-                        
-                        # Clean up temp file
-                        try:
-                            os.remove(temp_file)
-                        except:
-                            pass
-                    except Exception as temp_error:
-                        raise Exception(f"Both OneDrive methods failed: {str(temp_error)}")
-            else:
-                # Standard approach for non-OneDrive files
-                doc = word.Documents.Open(os.path.abspath(input_file))
-                doc.SaveAs(os.path.abspath(output_file), FileFormat=17)  # 17 is PDF format
-                doc.Close()
-                
-            return output_file
+        else:
+            # Standard approach for non-OneDrive files
+            doc = word.Documents.Open(abs_in)
+            doc.SaveAs(abs_out, FileFormat=17)  # 17 is PDF format
+            doc.Close()
+        
+        return output_file
+    
+    def kill(self):
+        """Force-kill this batch's Word process, leaving any other Word instance alone"""
+        if self.pid is None:
+            return
+        try:
+            subprocess.run(["taskkill", "/f", "/pid", str(self.pid)],
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+        except:
+            pass
+        self.pid = None
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        import pythoncom
+        
+        # Clean up COM resources
+        if self.word:
+            try:
+                self.word.Quit()
+            except:
+                pass
+            self.word = None
+        self.pid = None
+        pythoncom.CoUninitialize()
+        return False
+
+# Word instance kept by this process across conversions, see _get_word_batch
+_word_batch = None
+
+def _get_word_batch():
+    """Return this process's running WordBatch, starting Word on first use"""
+    global _word_batch
+    if _word_batch is None:
+        batch = WordBatch()
+        batch.__enter__()
+        _word_batch = batch
+    return _word_batch
+
+def _close_word_batch(force=False):
+    """
+    Stop this process's Word instance so the next conversion starts a fresh one.
+    force kills the process first, for a Word that may be hung and would block Quit.
+    """
+    global _word_batch
+    batch, _word_batch = _word_batch, None
+    if batch is not None:
+        if force:
+            batch.kill()
+        batch.__exit__(None, None, None)
+
+# Unlike atexit, this also runs when a pool worker process exits
+multiprocessing.util.Finalize(None, _close_word_batch, exitpriority=10)
+
+def convert_with_word(input_file, output_file=None, retries=2, timeout=30):
+    """Convert docx to PDF using Microsoft Word (Windows only), reusing this process's Word instance"""
+    for attempt in range(retries + 1):
+        try:
+            return _get_word_batch().convert(input_file, output_file)
             
         except Exception as e:
+            # Word may be hung or dead: kill this process's instance only, so a
+            # retry starts a fresh one without touching other workers' Word
+            _close_word_batch(force=True)
             if attempt < retries:
                 print(f"  Attempt {attempt+1} failed for {os.path.basename(input_file)}: {str(e)}")
                 # Wait before retrying
                 time.sleep(3)  # Increased wait time for corporate environments
-                
-                # Force close any hanging Word instances before retrying
-                try:
-                    # First try to close Word gracefully if we still have a reference
-                    if word:
-                        try:
-                            word.Quit()
-                        except:
-                            pass
-                    
-                    # Then use taskkill as a last resort
-                    import subprocess
-                    subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
-                                  stdout=subprocess.DEVNULL, 
-                                  stderr=subprocess.DEVNULL)
-                    time.sleep(2)  # Give system more time to close Word
-                except:
-                    pass
             else:
                 # All retries exhausted
                 raise Exception(f"MS Word conversion failed after {retries+1} attempts: {str(e)}")
-        finally:
-            # Clean up COM resources
-            if word:
-                try:
-                    word.Quit()
-                except:
-                    pass
-            pythoncom.CoUninitialize()
     
     # This should not be reached, but just in case
     raise Exception("Unknown error in Word conversion")
@@ -189,16 +310,20 @@ def convert_with_word(input_file, output_file=None, retries=2, timeout=30):
 def process_file(file_path, output_dir, use_word):
     """Process a single file conversion with error handling"""
     try:
+        # Build absolute paths once so the converters can use them as-is
         input_path = os.path.abspath(file_path)
         output_name = Path(file_path).stem + ".pdf"
-        output_path = os.path.join(output_dir, output_name)
+        output_path = os.path.join(os.path.abspath(output_dir), output_name)
         
-        # Ensure we're on Windows since Word is required
-        if platform.system() != "Windows":
-            raise Exception("Microsoft Word conversion requires Windows")
-            
-        # Convert using Word
-        convert_with_word(input_path, output_path, retries=2)
+        if use_word:
+            # Ensure we're on Windows since Word is required
+            if not _IS_WINDOWS:
+                raise Exception("Microsoft Word conversion requires Windows")
+                
+            # Convert using Word
+            convert_with_word(input_path, output_path, retries=2)
+        else:
+            convert_with_libreoffice(input_path, output_path)
         return (file_path, True, None)
     except Exception as e:
         return (file_path, False, str(e))
@@ -213,19 +338,23 @@ def main():
                        help='Maximum number of retries for failed conversions')
     parser.add_argument('--batch-size', '-b', type=int, default=10,
                        help='Number of files to process before restarting Word (prevents memory leaks)')
+    parser.add_argument('--libreoffice', action='store_true',
+                       help='Convert with LibreOffice instead of Microsoft Word (default off Windows)')
     
     args = parser.parse_args()
     
-    # Check if we're on Windows
-    if platform.system() != "Windows":
-        print("Error: This script requires Windows with Microsoft Word installed")
-        return 1
+    # Microsoft Word is only available on Windows; use LibreOffice elsewhere
+    use_word = _IS_WINDOWS and not args.libreoffice
     
     # Validate input directory
     if not os.path.isdir(args.input_dir):
         print(f"Error: {args.input_dir} is not a valid directory")
         return 1
     
+    if not use_word and not (_SOFFICE and shutil.which(_SOFFICE)):
+        print("Error: LibreOffice executable not found; install LibreOffice to convert without Microsoft Word")
+        return 1
+    
     # Set up output directory
     output_dir = args.output_dir if args.output_dir else args.input_dir
     if not os.path.exists(output_dir):
@@ -245,49 +374,72 @@ def main():
     print(f"Found {len(docx_files)} .docx files to convert")
     
     # Print configuration
-    print("Using Microsoft Word for conversion")
-    print(f"Using {args.workers} worker processes")
+    if use_word:
+        print("Using Microsoft Word for conversion")
+        print(f"Using {args.workers} worker processes")
+    else:
+        print("Using LibreOffice for conversion")
     
     # Initialize counters and timing
     start_time = time.time()
     successful = 0
     failed = 0
     
-    # Process in smaller batches to prevent memory issues in corporate environments
-    batch_size = args.batch_size
-    for i in range(0, len(docx_files), batch_size):
-        batch = docx_files[i:i+batch_size]
+    if not use_word:
+        # Hand LibreOffice many files per invocation to pay its startup cost once per chunk
+        with tqdm(total=len(docx_files), unit="file") as pbar:
+            for i in range(0, len(docx_files), LIBREOFFICE_CHUNK_SIZE):
+                chunk = docx_files[i:i+LIBREOFFICE_CHUNK_SIZE]
+                try:
+                    missed = convert_many_with_libreoffice(chunk, output_dir)
+                except OSError as e:
+                    print(f"Error: could not run LibreOffice: {str(e)}")
+                    return 1
+                successful += len(chunk) - len(missed)
+                
+                # Fall back to one invocation per file for anything the batch missed
+                for file in missed:
+                    file_path, success, error = process_file(file, output_dir, False)
+                    if success:
+                        successful += 1
+                    else:
+                        failed += 1
+                        print(f"Error converting {file_path}: {error}")
+                pbar.update(len(chunk))
+    else:
+        # Process in smaller batches to prevent memory issues in corporate environments
+        batch_size = args.batch_size
+        for i in range(0, len(docx_files), batch_size):
+            batch = docx_files[i:i+batch_size]
         
-        print(f"\nProcessing batch {i//batch_size + 1} of {(len(docx_files) + batch_size - 1) // batch_size} ({len(batch)} files)")
+            print(f"\nProcessing batch {i//batch_size + 1} of {(len(docx_files) + batch_size - 1) // batch_size} ({len(batch)} files)")
         
-        # Clean up any existing Word processes before each batch
-        try:
-            import subprocess
-            subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
-                          stdout=subprocess.DEVNULL, 
-                          stderr=subprocess.DEVNULL)
-            time.sleep(1)  # Give system time to close Word
-        except:
-            pass
+            # Clean up any existing Word processes before each batch
+            try:
+                import subprocess
+                subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
+                              stdout=subprocess.DEVNULL, 
+                              stderr=subprocess.DEVNULL)
+                time.sleep(1)  # Give system time to close Word
+            except:
+                pass
                 
-        # Process the current batch
-        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
-            # Submit jobs for this batch
-            future_to_file = {
-                executor.submit(process_file, file, output_dir, True): file
-                for file in batch
-            }
-            
-            # Process results
-            with tqdm(total=len(batch), unit="file") as pbar:
-                for future in concurrent.futures.as_completed(future_to_file):
-                    file_path, success, error = future.result()
+            # Process the current batch, handing files to workers in chunks to cut IPC round-trips
+            convert_file = partial(process_file, output_dir=output_dir, use_word=True)
+            chunksize = max(1, len(batch) // (args.workers * 4))
+            with multiprocessing.Pool(processes=args.workers) as pool:
+                # Results arrive as soon as any worker finishes
+                for file_path, success, error in tqdm(pool.imap_unordered(convert_file, batch, chunksize=chunksize),
+                                                      total=len(batch), unit="file"):
                     if success:
                         successful += 1
                     else:
                         failed += 1
                         print(f"Error converting {file_path}: {error}")
-                    pbar.update(1)
+                
+                # Let the workers exit normally so each quits its own Word instance
+                pool.close()
+                pool.join()
     
     # Report results
     elapsed_time = time.time() - start_time
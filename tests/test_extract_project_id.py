@@ -0,0 +1,54 @@
+import os
+import sys
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PID_RENAME import extract_project_id
+
+
+def _write_pdf(path, page_contents):
+    """Write a PDF with one Helvetica page per content stream"""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for content in page_contents:
+        page = PageObject.create_blank_page(width=612, height=792)
+        stream = DecodedStreamObject()
+        stream.set_data(content)
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        writer.add_page(page)
+    with open(path, "wb") as file:
+        writer.write(file)
+
+
+def test_literal_id_on_first_page(tmp_path):
+    pdf_path = str(tmp_path / "literal.pdf")
+    _write_pdf(pdf_path, [b"BT /F1 12 Tf 72 720 Td (Project P123456) Tj ET"])
+    assert extract_project_id(pdf_path) == "P123456"
+
+
+def test_earlier_page_only_visible_to_extract_text(tmp_path):
+    """An ID that only text extraction finds still beats a literal one on a later page"""
+    pdf_path = str(tmp_path / "hex.pdf")
+    _write_pdf(pdf_path, [
+        # "P111111" as a hex string: the raw content stream holds no P###### bytes
+        b"BT /F1 12 Tf 72 720 Td <50313131313131> Tj ET",
+        b"BT /F1 12 Tf 72 720 Td (Nothing here) Tj ET",
+        b"BT /F1 12 Tf 72 720 Td (See P333333) Tj ET",
+    ])
+    assert extract_project_id(pdf_path) == "P111111"
+
+
+def test_no_id(tmp_path):
+    pdf_path = str(tmp_path / "none.pdf")
+    _write_pdf(pdf_path, [b"BT /F1 12 Tf 72 720 Td (No project here) Tj ET"])
+    assert extract_project_id(pdf_path) is None
@@ -0,0 +1,22 @@
+import concurrent.futures
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import word_to_pdf
+
+
+def test_search_project_id_from_many_threads():
+    """Scans running at the same time on several threads each find their own ID"""
+    # Long texts keep scans running long enough to overlap
+    texts = [f"{'x' * 2_000_000}P{i:06d} end" for i in range(64)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(word_to_pdf._search_project_id, texts))
+    assert results == [f"P{i:06d}" for i in range(64)]
+
+
+def test_search_project_id_letter_o():
+    """IDs with OCR'd letter O are found raw; the O is corrected later"""
+    assert word_to_pdf._search_project_id("Project PO12345 report") == "PO12345"
+    assert word_to_pdf._search_project_id("no project id here") is None
@@ -2,20 +2,62 @@
 import os
 import time
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import platform
 import subprocess
 from tqdm import tqdm
 import sys
 import shutil
+import tempfile
+from uuid import uuid4
 import logging
 import psutil
 import argparse
 import re
+import json
+import hashlib
+import errno
+import threading
+from itertools import islice, repeat
+import multiprocessing.util
 import PyPDF2
-from langdetect import detect, LangDetectException
+from functools import lru_cache
+from langdetect import DetectorFactory, LangDetectException
+from langdetect.detector_factory import PROFILES_DIRECTORY
 import pandas as pd
 
+# PyMuPDF extracts text much faster than PyPDF2; use it when installed
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+# pypdf is the maintained successor of PyPDF2 and extracts text much faster
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# BLAKE3 hashes whole files several times faster than hashlib; use it when installed
+try:
+    from blake3 import blake3 as _content_hasher
+except ImportError:
+    def _content_hasher():
+        return hashlib.blake2b(digest_size=32)
+
+# lingua's compiled detector is much faster than langdetect; use it when installed
+try:
+    from lingua import Language, LanguageDetectorBuilder
+except ImportError:
+    LanguageDetectorBuilder = None
+
+# fastText's language ID model is faster still, but needs its model file
+try:
+    import fasttext
+except ImportError:
+    fasttext = None
+
 # Update the logging configuration to separate console and file handlers
 logging.basicConfig(
     level=logging.INFO,
@@ -31,29 +73,259 @@ console_handler.setLevel(logging.WARNING)  # Only warnings and errors to console
 console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
 logging.getLogger().addHandler(console_handler)
 
+# Project ID pattern (P followed by any 6 chars that could be digits or letter O)
+_PID_RE = re.compile(r'P[0-9O]{6}')
+# Maps letter O to digit 0 when correcting OCR'd project IDs
+_O_TO_0 = str.maketrans('O', '0')
+
+# Filename and spreadsheet patterns, compiled once instead of on every call
+_PID_BARE_RE = re.compile(r'(P\d{6})')     # Project ID anywhere in an output filename
+_PID_CLEAN_RE = re.compile(r'[^P0-9]')      # Characters stripped from spreadsheet project IDs
+_PID_MATCH_RE = re.compile(r'P\d{6}')      # Expected format of a cleaned project ID
+
+# Hyperscan compiles the same pattern to a DFA that scans text without
+# backtracking; fall back to re when it isn't installed or can't compile
+try:
+    import hyperscan
+    _PID_DB = hyperscan.Database()
+    _PID_DB.compile(expressions=[rb'P[0-9O]{6}'], ids=[0], flags=[hyperscan.HS_FLAG_SOM_LEFTMOST])
+except Exception:
+    _PID_DB = None
+# A scratch space can only serve one scan at a time and scans release the GIL,
+# so every thread gets its own
+_pid_scratch = threading.local()
+
+# On Linux, renameat2 with RENAME_NOREPLACE checks for an existing target and
+# renames in one atomic syscall; elsewhere the target is checked just before
+# os.rename, which leaves a short window where another process could create it
+RENAME_NOREPLACE = 1
+_AT_FDCWD = -100
+_renameat2 = None
+if platform.system() == "Linux":
+    try:
+        import ctypes
+        _renameat2 = ctypes.CDLL(None, use_errno=True).renameat2  # glibc 2.28+
+        _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    except (OSError, AttributeError):
+        _renameat2 = None
+
+# Resolved once at import for OneDrive temp copies
+_TEMP_DIR = tempfile.gettempdir()
+
+# Characters of text used for language detection; the cover pages settle it
+LANGUAGE_TEXT_LIMIT = 4096
+
+def _build_language_factory():
+    """Load the language profiles once into a deterministic detector factory"""
+    factory = DetectorFactory()
+    factory.seed = 0  # Make detection results reproducible between runs
+    # All profiles are needed: with a reduced set, languages outside it
+    # (German, Dutch, Turkish...) are forced onto the closest one, often English
+    factory.load_profile(PROFILES_DIRECTORY)
+    return factory
+
+# Languages lingua chooses between: English, the languages of the countries
+# projects are in, and those of the main co-financiers. Text in a language left
+# out is matched to the closest one listed, so keep the list broad
+LINGUA_LANGUAGES = (
+    'ENGLISH', 'FRENCH', 'SPANISH', 'PORTUGUESE', 'ARABIC', 'RUSSIAN', 'CHINESE',
+    'GERMAN', 'DUTCH', 'ITALIAN', 'TURKISH', 'AZERBAIJANI', 'KAZAKH', 'MONGOLIAN',
+    'ARMENIAN', 'GEORGIAN', 'UKRAINIAN', 'ROMANIAN', 'POLISH', 'BULGARIAN',
+    'SERBIAN', 'BOSNIAN', 'CROATIAN', 'MACEDONIAN', 'ALBANIAN', 'PERSIAN', 'URDU',
+    'HINDI', 'BENGALI', 'INDONESIAN', 'MALAY', 'VIETNAMESE', 'THAI', 'TAGALOG',
+    'SWAHILI', 'SOMALI',
+)
+
+@lru_cache(maxsize=1)
+def _get_lingua_detector():
+    """Build the lingua detector on first use in this process"""
+    # Only the listed languages' models can load, and low accuracy mode keeps just
+    # the trigram models: plenty for a page of text at a fraction of the memory
+    languages = [getattr(Language, name) for name in LINGUA_LANGUAGES]
+    return LanguageDetectorBuilder.from_languages(*languages).with_low_accuracy_mode().build()
+
+# fastText language ID model, looked for next to this script
+FASTTEXT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lid.176.ftz")
+
+@lru_cache(maxsize=1)
+def _get_fasttext_model():
+    """Load the fastText model on first use in this process, or None if it isn't available"""
+    if fasttext is None or not os.path.exists(FASTTEXT_MODEL_PATH):
+        return None
+    return fasttext.load_model(FASTTEXT_MODEL_PATH)
+
+# Set once fastText fails to predict, so the next detector is used from then on
+_fasttext_failed = False
+
+# Only needed when lingua isn't available
+_language_factory = _build_language_factory() if LanguageDetectorBuilder is None else None
+
+# Language results keyed by _language_cache_key, persisted in the output folder
+LANGUAGE_CACHE_FILENAME = ".pid_langcache.json"
+_language_cache = {}
+
+# Output PDFs already named with their mapped country, persisted in the output folder;
+# maps each absolute path to the (size, mtime_ns) it had when recorded
+RENAMED_LEDGER_FILENAME = ".renamed_ledger.json"
+_renamed_ledger = {}
+
+# LibreOffice, if installed, converts many documents per process startup
+_SOFFICE = shutil.which("soffice")
+# Poppler's pdftotext, if installed, is the fastest way to get text for language detection
+_PDFTOTEXT = shutil.which("pdftotext")
+# Seconds pdftotext may spend on one file; a malformed PDF can make it hang
+PDFTOTEXT_TIMEOUT_SEC = 30
+# Number of documents handed to a single LibreOffice invocation
+SOFFICE_BATCH_SIZE = 32
+
+# Microsoft Word type library (GUID, LCID, major, minor version)
+WORD_TYPELIB = ('{00020905-0000-0000-C000-000000000046}', 0, 8, 5)
+
+# Generate Word's COM wrappers once so Dispatch returns early-bound objects
+# instead of looking up every method and property by name at runtime
+if platform.system() == "Windows":
+    try:
+        import win32com.client
+        win32com.client.gencache.EnsureModule(*WORD_TYPELIB)
+    except Exception:
+        logging.warning("Could not load Word type library, using late-bound COM calls")
+
+# Word instance cached per thread (COM objects are bound to the thread's apartment)
+_word_local = threading.local()
+
+# Country mapping handed to each Word worker process once, by _init_word_worker
+_worker_country_mapping = None
+
+# Seconds a single file may take in Word before its process is killed
+WORD_TIMEOUT_SEC = 300
+
+def _new_word_app():
+    """Start a hidden Microsoft Word instance configured for batch conversion"""
+    import win32com.client
+    
+    word = win32com.client.DispatchEx("Word.Application")
+    word.Visible = False
+    word.DisplayAlerts = 0  # Don't show alerts
+    
+    # Set these additional properties for corporate environments
+    word.Options.CheckGrammarAsYouType = False
+    word.Options.CheckSpellingAsYouType = False
+    return word
+
+def _quit_word(word):
+    """Close a Word instance, ignoring errors if it is already gone"""
+    try:
+        word.Quit()
+    except:
+        pass
+
+def _word_pid(word):
+    """Find the process ID of a Word instance, or None if it can't be determined"""
+    try:
+        import win32gui
+        import win32process
+        
+        # Give the hidden main window a unique title so it can be found
+        caption = f"esf_{os.getpid()}_{uuid4().hex}"
+        word.Caption = caption
+        hwnd = win32gui.FindWindow("OpusApp", caption)
+        return win32process.GetWindowThreadProcessId(hwnd)[1] if hwnd else None
+    except Exception:
+        return None
+
+def _kill_word_process(pid):
+    """Force-kill one Word process, leaving other workers' instances alone"""
+    try:
+        subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE", "/fi", f"PID eq {pid}"],
+                      stdout=subprocess.DEVNULL,
+                      stderr=subprocess.DEVNULL)
+    except:
+        pass
+
+def _start_word_watchdog(timeout=WORD_TIMEOUT_SEC):
+    """
+    Kill this thread's Word process if the current file takes longer than timeout.
+    A hung Word blocks the COM call forever; killing it makes the call fail so
+    the retry logic can start a fresh instance. Returns the timer to cancel.
+    """
+    pid = getattr(_word_local, 'pid', None)
+    if pid is None:
+        return None
+    watchdog = threading.Timer(timeout, _kill_word_process, args=(pid,))
+    watchdog.daemon = True
+    watchdog.start()
+    return watchdog
+
+def _get_word():
+    """Return this thread's Word instance, starting it on first use"""
+    word = getattr(_word_local, 'word', None)
+    if word is None:
+        word = _new_word_app()
+        _word_local.word = word
+        _word_local.pid = _word_pid(word)
+        # Unlike atexit, this also runs when a pool worker process exits
+        multiprocessing.util.Finalize(None, _quit_word, args=(word,), exitpriority=10)
+    return word
+
+def _discard_word():
+    """Quit this thread's Word instance so the next call starts a fresh one"""
+    word = getattr(_word_local, 'word', None)
+    _word_local.word = None
+    _word_local.pid = None
+    if word is not None:
+        _quit_word(word)
+
+def _ensure_com():
+    """
+    Initialize COM once per thread. The apartment then lives as long as the
+    thread (for pool workers, the process), so the cached Word proxy stays
+    valid between files instead of being torn down after each conversion.
+    """
+    if getattr(_word_local, 'com_initialized', False):
+        return
+    import pythoncom
+    
+    pythoncom.CoInitialize()
+    _word_local.com_initialized = True
+    if threading.current_thread() is threading.main_thread():
+        # Lower priority than the Word quit finalizer, so Word is closed first;
+        # unlike atexit, this also runs when a pool worker process exits
+        multiprocessing.util.Finalize(None, pythoncom.CoUninitialize, exitpriority=0)
+
+def _init_word_worker(country_mapping=None):
+    """Process pool initializer: start one Word instance per worker process"""
+    global _worker_country_mapping
+    # Sent once per worker instead of being pickled into every task
+    _worker_country_mapping = country_mapping
+    
+    # Initialize COM in the worker's main thread for the life of the process
+    _ensure_com()
+    try:
+        _get_word()
+    except Exception as e:
+        # convert_with_word will retry starting Word on the first file
+        logging.warning(f"Could not start Word in worker {os.getpid()}: {str(e)}")
+
 def convert_with_word(input_file, output_file=None, retries=2):
     """Convert doc/docx to PDF using Microsoft Word (Windows only)"""
     if output_file is None:
         output_file = str(Path(input_file).with_suffix('.pdf'))
     
-    # Only import win32com if we're using this function
-    import win32com.client
-    import pythoncom
+    # Resolve both paths once; Word needs absolute paths
+    abs_in = os.path.abspath(input_file)
+    abs_out = os.path.abspath(output_file)
+    
     import time
     
-    # Initialize COM in this thread
-    pythoncom.CoInitialize()
+    # No-op in pool workers, where the initializer already set up COM
+    _ensure_com()
     
     for attempt in range(retries + 1):
-        word = None
+        watchdog = None
         try:
-            word = win32com.client.DispatchEx("Word.Application")
-            word.Visible = False
-            word.DisplayAlerts = 0  # Don't show alerts
-            
-            # Set these additional properties for corporate environments
-            word.Options.CheckGrammarAsYouType = False
-            word.Options.CheckSpellingAsYouType = False
+            # Reuse this thread's Word instance; only the document is opened per file
+            word = _get_word()
+            watchdog = _start_word_watchdog()
             
             # For OneDrive files, use a more robust approach
             if "OneDrive" in input_file:
@@ -61,7 +333,7 @@ def convert_with_word(input_file, output_file=None, retries=2):
                 try:
                     # Method 1: Open with ReadOnly flag to avoid lock issues
                     doc = word.Documents.Open(
-                        os.path.abspath(input_file), 
+                        abs_in, 
                         ReadOnly=True,
                         AddToRecentFiles=False,
                         Visible=False
@@ -69,7 +341,7 @@ def convert_with_word(input_file, output_file=None, retries=2):
                     
                     # Try export method instead of SaveAs for OneDrive files
                     doc.ExportAsFixedFormat(
-                        OutputFileName=os.path.abspath(output_file),
+                        OutputFileName=abs_out,
                         ExportFormat=17,  # wdExportFormatPDF
                         OpenAfterExport=False,
                         OptimizeFor=0,    # wdExportOptimizeForPrint
@@ -91,11 +363,8 @@ def convert_with_word(input_file, output_file=None, retries=2):
                         pass
                     
                     # Method 2: Copy the file to temp directory first
-                    import tempfile
-                    import shutil
-                    
-                    temp_dir = tempfile.gettempdir()
-                    temp_file = os.path.join(temp_dir, f"temp_{os.path.basename(input_file)}")
+                    # (pid + uuid keep names unique across parallel workers)
+                    temp_file = os.path.join(_TEMP_DIR, f"esf_{os.getpid()}_{uuid4().hex}_{os.path.basename(input_file)}")
                     
                     try:
                         # Copy to temp location
@@ -103,20 +372,20 @@ def convert_with_word(input_file, output_file=None, retries=2):
                         
                         # Try with the temp file
                         doc = word.Documents.Open(temp_file)
-                        doc.SaveAs(os.path.abspath(output_file), FileFormat=17)
+                        doc.SaveAs(abs_out, FileFormat=17)
                         doc.Close()
-                        
-                        # Clean up temp file
-                        try:
-                            os.remove(temp_file)
-                        except:
-                            pass
                     except Exception as temp_error:
                         raise Exception(f"Both OneDrive methods failed: {str(temp_error)}")
+                    finally:
+                        # Clean up temp file even if the conversion failed
+                        try:
+                            os.unlink(temp_file)
+                        except OSError:
+                            pass
             else:
                 # Standard approach for non-OneDrive files
-                doc = word.Documents.Open(os.path.abspath(input_file))
-                doc.SaveAs(os.path.abspath(output_file), FileFormat=17)  # 17 is PDF format
+                doc = word.Documents.Open(abs_in)
+                doc.SaveAs(abs_out, FileFormat=17)  # 17 is PDF format
                 doc.Close(SaveChanges=False)
                 
             return output_file
@@ -129,118 +398,362 @@ def convert_with_word(input_file, output_file=None, retries=2):
                 
                 # Force close any hanging Word instances before retrying
                 try:
-                    # First try to close Word gracefully if we still have a reference
-                    if word:
-                        try:
-                            word.Quit()
-                        except:
-                            pass
+                    # First close this thread's Word gracefully; the next attempt starts a new one
+                    pid = getattr(_word_local, 'pid', None)
+                    _discard_word()
                     
-                    # Then use taskkill as a last resort
-                    import subprocess
-                    subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
-                                  stdout=subprocess.DEVNULL, 
-                                  stderr=subprocess.DEVNULL)
-                    time.sleep(2)  # Give system more time to close Word
+                    # Then kill that process as a last resort, sparing other workers' Word
+                    if pid is not None:
+                        _kill_word_process(pid)
+                        time.sleep(2)  # Give system more time to close Word
                 except:
                     pass
             else:
                 # All retries exhausted
                 raise Exception(f"MS Word conversion failed after {retries+1} attempts: {str(e)}")
         finally:
-            # Clean up COM resources
-            if word:
-                try:
-                    word.Quit()
-                except:
-                    pass
-            pythoncom.CoUninitialize()
+            if watchdog is not None:
+                watchdog.cancel()
     
     # This should not be reached, but just in case
     raise Exception("Unknown error in Word conversion")
 
-def extract_project_id(pdf_path, max_pages=10):
+def convert_with_soffice(files, outdir):
     """
-    Extract the first occurrence of a World Bank project ID from a PDF file.
-    Project IDs are in the format P followed by 6 digits (e.g., P123456).
-    Also handles cases where 0 is transcribed as O.
+    Convert several Word documents to PDF with a single LibreOffice invocation.
+    
+    Args:
+        files: Paths of the documents to convert (their stems must be unique)
+        outdir: Directory LibreOffice writes the PDFs to
+        
+    Returns:
+        Dictionary mapping each converted input file to its PDF path
+    """
+    args = [_SOFFICE, "--headless", "--convert-to", "pdf", "--outdir", outdir, *files]
+    process = subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    if process.returncode != 0:
+        logging.error(f"LibreOffice conversion failed: {process.stderr.decode(errors='replace')}")
+    
+    # LibreOffice names each PDF after its input file; report the ones it produced
+    converted = {}
+    for file in files:
+        pdf_path = os.path.join(outdir, Path(file).stem + ".pdf")
+        if os.path.exists(pdf_path):
+            converted[file] = pdf_path
+    return converted
+
+def _search_project_id(text):
+    """Return the first raw P###### match in text (letter O not yet corrected), or None"""
+    if _PID_DB is not None:
+        data = text.encode('utf-8', 'ignore')
+        found = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            found.append(data[start:end])
+            return True  # Stop scanning at the first match
+        
+        try:
+            if getattr(_pid_scratch, 'scratch', None) is None:
+                _pid_scratch.scratch = hyperscan.Scratch(_PID_DB)
+            _PID_DB.scan(data, match_event_handler=on_match, scratch=_pid_scratch.scratch)
+        except hyperscan.ScanTerminated:
+            pass
+        except hyperscan.error as e:
+            logging.warning(f"Hyperscan scan failed, falling back to re: {str(e)}")
+            found = None
+        if found is not None:
+            return found[0].decode('ascii') if found else None
+    
+    match = _PID_RE.search(text)
+    return match.group(0) if match else None
+
+def _find_project_id_in_text(text):
+    """
+    Find the first project ID in a block of text, correcting letter O to digit 0.
+    
+    Args:
+        text: Text extracted from a PDF page
+        
+    Returns:
+        The corrected project ID if found, None otherwise
+    """
+    # Only the first match in the page is needed
+    pid = _search_project_id(text)
+    if pid:
+        # Fix any O's that should be 0's
+        # Replace letter 'O' with digit '0' in the project ID (starting after the P)
+        corrected_pid = 'P' + pid[1:].translate(_O_TO_0)
+        logging.info(f"Found project ID: {pid}, corrected to: {corrected_pid}")
+        return corrected_pid
+    
+    return None
+
+def _iter_page_texts(pdf_path, max_pages=10):
+    """
+    Yield the text of the first max_pages pages of a PDF, one page at a time.
+    Uses PyMuPDF when it is installed and falls back to PyPDF2 otherwise,
+    or when PyMuPDF cannot open the file.
+    """
+    if fitz is not None:
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            logging.warning(f"PyMuPDF could not open {pdf_path}, falling back to PyPDF2: {str(e)}")
+            doc = None
+        
+        if doc is not None:
+            try:
+                for page in doc.pages(0, min(doc.page_count, max_pages)):
+                    yield page.get_text("text")
+                return
+            finally:
+                doc.close()
+    
+    with open(pdf_path, 'rb') as file:
+        # Skip strict validation; only the first few pages are needed
+        reader = PyPDF2.PdfReader(file, strict=False)
+        for page in islice(reader.pages, max_pages):
+            yield page.extract_text() or ""
+
+def extract_project_id_with_text(pdf_path, max_pages=10, pages_to_check=3, project_id=None):
+    """
+    Extract the project ID and the text used for language detection in one pass,
+    so the PDF doesn't have to be parsed again by detect_language.
     
     Args:
         pdf_path: Path to the PDF file
-        max_pages: Maximum number of pages to search (default: 10)
+        max_pages: Maximum number of pages to search for the project ID (default: 10)
+        pages_to_check: Number of pages to collect text from for language detection
+        project_id: Project ID already known (e.g. from the filename); only text is collected
         
     Returns:
-        The project ID if found, None otherwise
+        Tuple of (project ID or None, text for detect_language_from_text)
     """
+    language_text = ""
+    if project_id and pages_to_check <= 0:
+        return project_id, language_text
+    
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            # Limit the number of pages to search
-            pages_to_search = min(len(reader.pages), max_pages)
+        # Pages load lazily in order, so once both the ID and enough text
+        # are found the later pages are never parsed
+        for page_num, text in enumerate(_iter_page_texts(pdf_path, max_pages)):
+            if not project_id:
+                project_id = _find_project_id_in_text(text)
             
-            # Regular expression pattern for project ID (P followed by any 6 chars that could be digits or letter O)
-            pattern = r'P[0-9O]{6}'
+            language_done = page_num >= pages_to_check or len(language_text) > 1000
+            if not language_done:
+                language_text += text
+                language_done = page_num == pages_to_check - 1 or len(language_text) > 1000
             
-            # Search through pages
-            for page_num in range(pages_to_search):
-                page = reader.pages[page_num]
-                text = page.extract_text()
+            if project_id and language_done:
+                break
                 
-                # Find all matches in the page
-                matches = re.findall(pattern, text)
-                if matches:
-                    # Get the first match and fix any O's that should be 0's
-                    pid = matches[0]
-                    # Replace letter 'O' with digit '0' in the project ID (starting after the P)
-                    corrected_pid = 'P' + pid[1:].replace('O', '0')
-                    logging.info(f"Found project ID: {pid}, corrected to: {corrected_pid}")
-                    return corrected_pid
-                    
-        return None
-        
     except Exception as e:
         logging.error(f"Error processing {pdf_path}: {str(e)}")
-        return None
+    
+    return project_id, language_text
 
-def get_unique_filename(base_path):
-    """Generate a unique filename by adding a numeric suffix"""
-    if not os.path.exists(base_path):
-        return base_path
+def extract_project_id(pdf_path, max_pages=10):
+    """
+    Extract the first occurrence of a World Bank project ID from a PDF file.
+    Project IDs are in the format P followed by 6 digits (e.g., P123456).
+    Also handles cases where 0 is transcribed as O.
     
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Maximum number of pages to search (default: 10)
+        
+    Returns:
+        The project ID if found, None otherwise
+    """
+    return extract_project_id_with_text(pdf_path, max_pages, pages_to_check=0)[0]
+
+def _iter_files(root, exts):
+    """
+    Recursively yield os.DirEntry objects for files under root whose names
+    end with one of exts (lowercase, e.g. ('.pdf',)).
+    Uses os.scandir so file type checks don't need an extra stat call.
+    Like os.walk, directories and entries that can't be read are skipped.
+    """
+    try:
+        entries = os.scandir(root)
+    except OSError as e:
+        logging.warning(f"Skipping unreadable directory {root}: {str(e)}")
+        return
+    with entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+            if is_dir:
+                yield from _iter_files(entry.path, exts)
+            elif is_file and entry.name.lower().endswith(exts):
+                yield entry
+
+def _dir_names(listings, directory):
+    """Return the cached set of names in directory, listing it on first use"""
+    if directory not in listings:
+        listings[directory] = {entry.name for entry in os.scandir(directory)}
+    return listings[directory]
+
+def _fast_copy(src, dst):
+    """
+    Copy src to dst, hardlinking when both are on the same volume.
+    The output copies are only ever renamed, never written to, so sharing
+    the data with the source is safe and skips reading and writing the file.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Cross-device, unsupported filesystem or dst already exists
+        shutil.copy2(src, dst)
+
+def get_unique_filename(base_path, existing=None):
+    """
+    Generate a unique filename by adding a numeric suffix.
+    If existing (the set of names already in the directory) is given, it is
+    checked instead of the filesystem and the chosen name is added to it.
+    """
     directory = os.path.dirname(base_path)
     filename = os.path.basename(base_path)
+    
+    def is_taken(name):
+        if existing is not None:
+            return name in existing
+        return os.path.exists(os.path.join(directory, name))
+    
+    if not is_taken(filename):
+        if existing is not None:
+            existing.add(filename)
+        return base_path
+    
     name, ext = os.path.splitext(filename)
     
     counter = 1
     while True:
         new_filename = f"{name}_{counter:02d}{ext}"
-        new_path = os.path.join(directory, new_filename)
-        if not os.path.exists(new_path):
-            return new_path
+        if not is_taken(new_filename):
+            if existing is not None:
+                existing.add(new_filename)
+            return os.path.join(directory, new_filename)
         counter += 1
 
-def process_file(file_path, output_dir, input_dir, rename_with_pid=True, country_mapping=None):
-    """Process a single file conversion with error handling and optional PID renaming"""
-    try:
-        input_path = os.path.abspath(file_path)
-        
-        # Get the relative path more carefully
-        rel_path = os.path.dirname(os.path.relpath(input_path, input_dir))
+def _reserve_unique_path(directory, stem, ext):
+    """
+    Atomically claim stem + ext in directory, adding a _01, _02, ... suffix
+    if the name is taken. An empty placeholder is created so that parallel
+    workers can never pick the same name; callers os.replace it with the real file.
+    """
+    candidate = f"{stem}{ext}"
+    counter = 1
+    while True:
+        path = os.path.join(directory, candidate)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return path
+        except FileExistsError:
+            candidate = f"{stem}_{counter:02d}{ext}"
+            counter += 1
+
+def _prepare_output_path(file_path, output_dir, input_dir):
+    """
+    Mirror the input folder structure under output_dir and pick a PDF name
+    that doesn't overwrite an existing file.
+    
+    Returns:
+        Tuple of (absolute input path, target directory, output PDF path)
+    """
+    input_path = os.path.abspath(file_path)
+    
+    # Get the relative path more carefully
+    rel_path = os.path.dirname(os.path.relpath(input_path, input_dir))
+    
+    if rel_path and rel_path != '.':
+        target_dir = os.path.join(output_dir, rel_path)
+        os.makedirs(target_dir, exist_ok=True)
+    else:
+        target_dir = output_dir
         
-        if rel_path and rel_path != '.':
-            target_dir = os.path.join(output_dir, rel_path)
-            os.makedirs(target_dir, exist_ok=True)
+    output_name = Path(file_path).stem + ".pdf"
+    output_path = os.path.join(target_dir, output_name)
+    
+    # Always check if output file already exists, regardless of the source
+    if os.path.exists(output_path):
+        logging.warning(f"File already exists, creating unique name: {output_path}")
+        output_path = get_unique_filename(output_path)
+        logging.info(f"Using unique name: {output_path}")
+    
+    return input_path, target_dir, output_path
+
+def _rename_converted_pdf(file_path, pdf_path, target_dir, rename_with_pid=True, country_mapping=None):
+    """
+    Rename a freshly converted PDF with its project ID, country and language.
+    
+    Returns:
+        Tuple of (source file, success, error, project ID) like process_file
+    """
+    # If renaming with project ID is requested
+    if rename_with_pid and pdf_path:
+        # Check the filename first; it is much cheaper than parsing the PDF
+        project_id = extract_project_id_from_filename(os.path.basename(file_path))
+        language_text = None
+        if project_id:
+            logging.info(f"Found project ID in filename: {project_id}")
         else:
-            target_dir = output_dir
-            
-        output_name = Path(file_path).stem + ".pdf"
-        output_path = os.path.join(target_dir, output_name)
+            # Extract project ID and the language text from the converted PDF in one pass
+            logging.info(f"No project ID found in filename, checking PDF content: {pdf_path}")
+            project_id, language_text = extract_project_id_with_text(pdf_path)
         
-        # Always check if output file already exists, regardless of the source
-        if os.path.exists(output_path):
-            logging.warning(f"File already exists, creating unique name: {output_path}")
-            output_path = get_unique_filename(output_path)
-            logging.info(f"Using unique name: {output_path}")
+        if project_id:
+            # Detect language on the converted PDF before it is renamed
+            language_suffix = detect_language(pdf_path, text=language_text)
+            
+            # Get country if available
+            # (countries are already filename-safe, see load_project_country_mapping)
+            country = country_mapping.get(project_id, "") if country_mapping else ""
+            if country:
+                logging.info(f"Found country '{country}' for project ID {project_id}")
+            
+            # Create final filename with project ID, country (if available), and language
+            if country:
+                pid_stem = f"{project_id}_{country}_{language_suffix}"
+            else:
+                pid_stem = f"{project_id}_{language_suffix}"
+            
+            # Rename straight to the final name in a single step
+            pid_path = None
+            try:
+                pid_path = _reserve_unique_path(target_dir, pid_stem, ".pdf")
+                os.replace(pdf_path, pid_path)
+                logging.info(f"Renamed to: {os.path.basename(pid_path)}")
+                if country:
+                    # Only reaches the final pass when run in the main process;
+                    # files renamed by Word pool workers are checked there instead
+                    _record_renamed(pid_path)
+                return (file_path, True, None, project_id)
+            except Exception as e:
+                if pid_path:
+                    try:
+                        os.remove(pid_path)
+                    except:
+                        pass
+                logging.error(f"Error renaming {pdf_path}: {str(e)}")
+                return (file_path, True, None, project_id)  # Still return project_id as we found it
+        else:
+            logging.warning(f"No project ID found in PDF or filename: {pdf_path}")
+            return (file_path, True, None, None)
+    
+    return (file_path, True, None, None)
+
+def process_file(file_path, output_dir, input_dir, rename_with_pid=True, country_mapping=None):
+    """Process a single file conversion with error handling and optional PID renaming"""
+    if country_mapping is None:
+        # Pool workers get the mapping from _init_word_worker
+        country_mapping = _worker_country_mapping
+    try:
+        input_path, target_dir, output_path = _prepare_output_path(file_path, output_dir, input_dir)
         
         # Log the paths to help debug
         logging.info(f"Converting: {input_path} -> {output_path}")
@@ -252,101 +765,64 @@ def process_file(file_path, output_dir, input_dir, rename_with_pid=True, country
         # Convert using Word
         pdf_path = convert_with_word(input_path, output_path, retries=2)
         
-        # If renaming with project ID is requested
-        if rename_with_pid and pdf_path:
-            # Extract project ID from the converted PDF
-            project_id = extract_project_id(pdf_path)
-            
-            # If no project ID found in PDF content, check the filename
-            if not project_id:
-                logging.info(f"No project ID found in PDF content, checking filename: {os.path.basename(file_path)}")
-                project_id = extract_project_id_from_filename(os.path.basename(file_path))
-                if project_id:
-                    logging.info(f"Found project ID in filename: {project_id}")
-            
-            if project_id:
-                # First rename with just the project ID
-                base_pid_filename = f"{project_id}.pdf"
-                base_pid_path = os.path.join(target_dir, base_pid_filename)
-                
-                # Handle duplicate filenames for base project ID
-                if os.path.exists(base_pid_path):
-                    counter = 1
-                    while True:
-                        temp_name = f"{project_id}_{counter:02d}.pdf"
-                        temp_path = os.path.join(target_dir, temp_name)
-                        if not os.path.exists(temp_path):
-                            base_pid_path = temp_path
-                            base_pid_filename = temp_name
-                            break
-                        counter += 1
-                
-                # Rename to the base project ID first
-                try:
-                    os.rename(pdf_path, base_pid_path)
-                    logging.info(f"First renamed to: {base_pid_filename}")
-                    pdf_path = base_pid_path  # Update pdf_path for further processing
-                except Exception as e:
-                    logging.error(f"Error in first renaming step: {str(e)}")
-                    return (file_path, True, None, None)
-                
-                # Now add country and language information
-                # Detect language
-                language_suffix = detect_language(pdf_path)
-                
-                # Get country if available
-                country = ""
-                if country_mapping and project_id in country_mapping:
-                    country = country_mapping[project_id]
-                    country = country.replace(" ", "_")  # Replace spaces with underscores
-                    logging.info(f"Found country '{country}' for project ID {project_id}")
-                
-                # Create final filename with project ID, country (if available), and language
-                if country:
-                    pid_filename = f"{project_id}_{country}_{language_suffix}.pdf"
-                else:
-                    pid_filename = f"{project_id}_{language_suffix}.pdf"
-                
-                pid_path = os.path.join(target_dir, pid_filename)
-                
-                # Handle duplicate filenames for the final name
-                if os.path.exists(pid_path) and pid_path != pdf_path:
-                    counter = 1
-                    while True:
-                        if country:
-                            temp_name = f"{project_id}_{country}_{language_suffix}_{counter:02d}.pdf"
-                        else:
-                            temp_name = f"{project_id}_{language_suffix}_{counter:02d}.pdf"
-                        temp_path = os.path.join(target_dir, temp_name)
-                        if not os.path.exists(temp_path) or temp_path == pdf_path:
-                            pid_path = temp_path
-                            pid_filename = temp_name
-                            break
-                        counter += 1
-                
-                # Perform the final rename
-                try:
-                    os.rename(pdf_path, pid_path)
-                    logging.info(f"Final renamed to: {pid_filename}")
-                    return (file_path, True, None, project_id)
-                except Exception as e:
-                    logging.error(f"Error in final renaming step: {str(e)}")
-                    return (file_path, True, None, project_id)  # Still return project_id as we found it
-            else:
-                logging.warning(f"No project ID found in PDF or filename: {pdf_path}")
-                return (file_path, True, None, None)
-        
-        return (file_path, True, None, None)
+        return _rename_converted_pdf(file_path, pdf_path, target_dir, rename_with_pid, country_mapping)
     except Exception as e:
         return (file_path, False, str(e), None)
 
+def _init_analysis_worker(language_cache):
+    """Seed a worker process with the language results already known to the parent"""
+    _language_cache.update(language_cache)
+
+def _analyze_pdf(pdf_path, max_pages=10, pages_to_check=3):
+    """
+    Find the project ID and language of a source PDF in one pass over its pages.
+    Runs in worker processes: each page's text is extracted once and used for
+    both the project ID search and language detection.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Maximum number of pages to search for the project ID
+        pages_to_check: Number of pages used for language detection
+        
+    Returns:
+        Tuple of (project ID or None, language suffix or None, language cache keys)
+    """
+    try:
+        return _analyze_pdf_unchecked(pdf_path, max_pages, pages_to_check)
+    except Exception as e:
+        # One unreadable PDF must not abort the whole copy pass
+        logging.error(f"Error analyzing {pdf_path}: {str(e)}")
+        project_id = extract_project_id_from_filename(os.path.basename(pdf_path))
+        return (project_id, "NON", []) if project_id else (None, None, [])
+
+def _analyze_pdf_unchecked(pdf_path, max_pages, pages_to_check):
+    """Body of _analyze_pdf; may raise on unexpected errors"""
+    # Check the filename first; it is much cheaper than parsing the PDF
+    project_id = extract_project_id_from_filename(os.path.basename(pdf_path))
+    
+    # The language only matters once there is a project ID, so files without one
+    # in the name are looked up after the ID search instead of being hashed up front
+    language_suffix, keys = _cached_language(pdf_path) if project_id else (None, None)
+    if project_id and language_suffix:
+        return project_id, language_suffix, keys
+    
+    # Text is only needed when the language isn't cached yet
+    project_id, language_text = extract_project_id_with_text(pdf_path, max_pages, pages_to_check, project_id)
+    
+    if not project_id:
+        return None, None, []
+    
+    if keys is None:
+        language_suffix, keys = _cached_language(pdf_path)
+    
+    # The copy has the same content, so its language is the source's language
+    if language_suffix is None:
+        language_suffix = detect_language_from_text(language_text, pdf_path)
+    return project_id, language_suffix, keys
+
 def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=True, country_mapping=None):
     """Copy all existing PDF files from input directory to output directory"""
-    pdf_files = []
-    for root, _, files in os.walk(input_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                pdf_files.append(os.path.join(root, file))
+    pdf_files = [entry.path for entry in _iter_files(input_dir, ('.pdf',))]
     
     if not pdf_files:
         print(f"No PDF files found in {input_dir}")
@@ -357,9 +833,27 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
     copied = 0
     skipped = 0
     pid_mapping = {}  # To store file -> project ID mapping
+    # Names in each target directory, listed once and kept up to date as files are copied
+    listings = {}
     
-    with tqdm(total=len(pdf_files), unit="file") as pbar:
-        for pdf_file in pdf_files:
+    # Parsing and language detection are CPU-bound, so they run in worker
+    # processes while the main process copies and renames in order
+    workers = os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                initializer=_init_analysis_worker,
+                                                initargs=(dict(_language_cache),)) as executor, \
+         tqdm(total=len(pdf_files), unit="file") as pbar:
+        if rename_with_pid:
+            analyses = executor.map(_analyze_pdf, pdf_files,
+                                    chunksize=max(1, len(pdf_files) // (workers * 4)))
+        else:
+            analyses = repeat((None, None, []))
+        for pdf_file, (project_id, language_suffix, language_keys) in zip(pdf_files, analyses):
+            if language_suffix:
+                # Keep results found in the workers for save_language_cache
+                for language_key in language_keys:
+                    _language_cache[language_key] = language_suffix
+            
             # Create the relative path for maintaining folder structure
             rel_path = os.path.relpath(os.path.dirname(pdf_file), start=input_dir)
             if rel_path != '.':
@@ -370,49 +864,36 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
             
             # Get the destination path initially (will be modified if project ID is found)
             dest_file = os.path.join(target_dir, os.path.basename(pdf_file))
+            existing = _dir_names(listings, target_dir)
             
             try:
                 # If renaming with project ID is requested
                 if rename_with_pid:
-                    # Extract project ID from the PDF
-                    project_id = extract_project_id(pdf_file)
-                    
-                    # If no project ID found in PDF content, check the filename
-                    if not project_id:
-                        logging.info(f"No project ID found in PDF content, checking filename: {os.path.basename(pdf_file)}")
-                        project_id = extract_project_id_from_filename(os.path.basename(pdf_file))
-                        if project_id:
-                            logging.info(f"Found project ID in filename: {project_id}")
-                    
                     if project_id:
                         # First create a base project ID filename
                         base_pid_filename = f"{project_id}.pdf"
                         base_dest_file = os.path.join(target_dir, base_pid_filename)
                         
                         # Handle duplicate filenames for base project ID
-                        if os.path.exists(base_dest_file):
+                        if base_pid_filename in existing:
                             counter = 1
                             while True:
                                 temp_name = f"{project_id}_{counter:02d}.pdf"
-                                temp_path = os.path.join(target_dir, temp_name)
-                                if not os.path.exists(temp_path):
-                                    base_dest_file = temp_path
+                                if temp_name not in existing:
+                                    base_dest_file = os.path.join(target_dir, temp_name)
                                     base_pid_filename = temp_name
                                     break
                                 counter += 1
                         
                         # Copy with base project ID first
-                        shutil.copy2(pdf_file, base_dest_file)
+                        _fast_copy(pdf_file, base_dest_file)
+                        existing.add(base_pid_filename)
                         logging.info(f"First copied with project ID: {pdf_file} -> {base_dest_file}")
                         
-                        # Detect language
-                        language_suffix = detect_language(base_dest_file)
-                        
                         # Get country if available
-                        country = ""
-                        if country_mapping and project_id in country_mapping:
-                            country = country_mapping[project_id]
-                            country = country.replace(" ", "_")  # Replace spaces with underscores
+                        # (countries are already filename-safe, see load_project_country_mapping)
+                        country = country_mapping.get(project_id, "") if country_mapping else ""
+                        if country:
                             logging.info(f"Found country '{country}' for project ID {project_id}")
                         
                         # Create final filename with project ID, country (if available), and language
@@ -424,16 +905,15 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
                         final_dest_file = os.path.join(target_dir, pid_filename)
                         
                         # Handle duplicate filenames for final name
-                        if os.path.exists(final_dest_file) and final_dest_file != base_dest_file:
+                        if pid_filename in existing and pid_filename != base_pid_filename:
                             counter = 1
                             while True:
                                 if country:
                                     temp_name = f"{project_id}_{country}_{language_suffix}_{counter:02d}.pdf"
                                 else:
                                     temp_name = f"{project_id}_{language_suffix}_{counter:02d}.pdf"
-                                temp_path = os.path.join(target_dir, temp_name)
-                                if not os.path.exists(temp_path) or temp_path == base_dest_file:
-                                    final_dest_file = temp_path
+                                if temp_name not in existing or temp_name == base_pid_filename:
+                                    final_dest_file = os.path.join(target_dir, temp_name)
                                     pid_filename = temp_name
                                     break
                                 counter += 1
@@ -441,9 +921,13 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
                         # Rename to final filename
                         try:
                             os.rename(base_dest_file, final_dest_file)
+                            existing.discard(base_pid_filename)
+                            existing.add(pid_filename)
                             logging.info(f"Final filename: {final_dest_file}")
                             copied += 1
                             pid_mapping[final_dest_file] = project_id
+                            if country:
+                                _record_renamed(final_dest_file)
                         except Exception as e:
                             logging.error(f"Error in final rename: {str(e)}")
                             # Even if final rename fails, we've copied the file
@@ -453,26 +937,28 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
                         # No project ID found, use original filename
                         logging.warning(f"No project ID found in PDF or filename: {pdf_file}")
                         # Check if file already exists
-                        if os.path.exists(dest_file):
-                            unique_dest = get_unique_filename(dest_file)
-                            shutil.copy2(pdf_file, unique_dest)
+                        if os.path.basename(dest_file) in existing:
+                            unique_dest = get_unique_filename(dest_file, existing)
+                            _fast_copy(pdf_file, unique_dest)
                             logging.info(f"Created unique filename: {unique_dest}")
                             copied += 1
                         else:
                             # No conflict, copy normally
-                            shutil.copy2(pdf_file, dest_file)
+                            _fast_copy(pdf_file, dest_file)
+                            existing.add(os.path.basename(dest_file))
                             copied += 1
                 else:
                     # Standard copy without PID renaming
                     # Check if file already exists
-                    if os.path.exists(dest_file):
-                        unique_dest = get_unique_filename(dest_file)
-                        shutil.copy2(pdf_file, unique_dest)
+                    if os.path.basename(dest_file) in existing:
+                        unique_dest = get_unique_filename(dest_file, existing)
+                        _fast_copy(pdf_file, unique_dest)
                         logging.info(f"Created unique filename: {unique_dest}")
                         copied += 1
                     else:
                         # No conflict, copy normally
-                        shutil.copy2(pdf_file, dest_file)
+                        _fast_copy(pdf_file, dest_file)
+                        existing.add(os.path.basename(dest_file))
                         copied += 1
             except Exception as e:
                 error_msg = f"Error copying {pdf_file}: {str(e)}"
@@ -485,34 +971,106 @@ def copy_existing_pdfs(input_dir, output_dir, overwrite=False, rename_with_pid=T
     print(f"PDF copying complete. Copied: {copied}, Skipped: {skipped}")
     return copied, pid_mapping
 
-def process_batch(batch, output_dir, input_dir, rename_with_pid=True, country_mapping=None):
+def _word_pool(max_workers=None, country_mapping=None):
+    """Start the Word worker processes; each keeps its own Word instance until shutdown"""
+    # Separate processes avoid GIL contention and COM apartment sharing
+    return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers or get_optimal_workers(),
+                                                  initializer=_init_word_worker,
+                                                  initargs=(country_mapping,))
+
+def process_batch(batch, output_dir, input_dir, rename_with_pid=True, country_mapping=None, max_workers=None,
+                  executor=None):
+    """
+    Convert a batch of Word documents in Word worker processes.
+    executor is a pool from _word_pool, shared across batches so Word stays up
+    between them; it already holds the country mapping. Without one, a pool is
+    started for this batch alone.
+    """
+    if executor is None:
+        with _word_pool(max_workers, country_mapping) as executor:
+            return process_batch(batch, output_dir, input_dir, rename_with_pid, executor=executor)
+    
     # Make tqdm output more compact with less messages
     with tqdm(total=len(batch), unit="file", desc="Converting") as pbar:
-        futures = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=get_optimal_workers()) as executor:
-            future_to_file = {
-                executor.submit(process_file, file, output_dir, input_dir, rename_with_pid, country_mapping): file
-                for file in batch
-            }
+        future_to_file = {
+            executor.submit(process_file, file, output_dir, input_dir, rename_with_pid): file
+            for file in batch
+        }
+        
+        for future in concurrent.futures.as_completed(future_to_file):
+            file = future_to_file[future]
+            try:
+                _, success, error, _ = future.result()
+                if not success:
+                    print(f"Error processing {os.path.basename(file)}: {error}")
+            except Exception as e:
+                print(f"Exception processing {os.path.basename(file)}: {str(e)}")
             
-            for future in concurrent.futures.as_completed(future_to_file):
-                file = future_to_file[future]
-                try:
-                    _, success, error, _ = future.result()
-                    if not success:
-                        print(f"Error processing {os.path.basename(file)}: {error}")
-                except Exception as e:
-                    print(f"Exception processing {os.path.basename(file)}: {str(e)}")
-                
-                pbar.update(1)
+            pbar.update(1)
+    
+    return len(batch)
+
+def process_batch_with_soffice(batch, output_dir, input_dir, rename_with_pid=True, country_mapping=None):
+    """Convert a batch of Word documents with LibreOffice, several files per invocation"""
+    # Group files so no two in a chunk share a stem, since their PDFs would collide
+    chunks = []
+    for file in batch:
+        stem = Path(file).stem.lower()
+        for chunk in chunks:
+            if len(chunk) < SOFFICE_BATCH_SIZE and stem not in chunk:
+                chunk[stem] = file
+                break
+        else:
+            chunks.append({stem: file})
+    
+    # Renaming (PDF parsing and language detection) runs on worker threads while
+    # LibreOffice converts the next chunk; PyMuPDF isn't thread-safe, so it gets one
+    workers = 1 if fitz is not None else min(16, (os.cpu_count() or 1) * 2)
+    
+    with tqdm(total=len(batch), unit="file", desc="Converting") as pbar, \
+         concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for chunk in chunks:
+            files = list(chunk.values())
+            # Convert into a scratch folder, then move each PDF to its unique output name
+            with tempfile.TemporaryDirectory(dir=output_dir) as scratch_dir:
+                converted = convert_with_soffice(files, scratch_dir)
+                for file in files:
+                    if file not in converted:
+                        print(f"Error processing {os.path.basename(file)}: LibreOffice did not produce a PDF")
+                        pbar.update(1)
+                        continue
+                    try:
+                        _, target_dir, output_path = _prepare_output_path(file, output_dir, input_dir)
+                        shutil.move(converted[file], output_path)
+                    except Exception as e:
+                        print(f"Exception processing {os.path.basename(file)}: {str(e)}")
+                        pbar.update(1)
+                        continue
+                    future = executor.submit(_rename_converted_pdf, file, output_path, target_dir,
+                                             rename_with_pid, country_mapping)
+                    future.add_done_callback(lambda _: pbar.update(1))
+                    pending[future] = file
+        
+        for future in concurrent.futures.as_completed(pending):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Exception processing {os.path.basename(pending[future])}: {str(e)}")
     
     return len(batch)
 
-def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
-    """Convert all Word documents in a folder to PDF"""
-    # Check if we're on Windows
-    if platform.system() != "Windows":
-        print("Error: This script requires Windows with Microsoft Word installed")
+def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None, workers=None,
+                          pid_column=None, country_column=None):
+    """
+    Convert all Word documents in a folder to PDF.
+    workers overrides the number of Word worker processes from get_optimal_workers;
+    pid_column and country_column select the spreadsheet columns (name or number).
+    """
+    # Prefer LibreOffice when installed; otherwise Microsoft Word is required
+    use_soffice = _SOFFICE is not None
+    if not use_soffice and platform.system() != "Windows":
+        print("Error: This script requires LibreOffice, or Windows with Microsoft Word installed")
         return 1
     
     # Prompt user for the input folder path
@@ -537,7 +1095,7 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
             spreadsheet_path = input().strip().strip('"\'')
             
             if os.path.exists(spreadsheet_path):
-                country_mapping = load_project_country_mapping(spreadsheet_path)
+                country_mapping = load_project_country_mapping(spreadsheet_path, pid_column, country_column)
             else:
                 print(f"Warning: Spreadsheet file not found: {spreadsheet_path}")
                 country_mapping = {}
@@ -552,17 +1110,18 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    # Reuse language results from earlier runs into this output folder
+    load_language_cache(output_dir)
+    
     # Find all .docx and .doc files
     word_files = []
     # Find all .pdf files
     pdf_files = []
-    for root, _, files in os.walk(input_dir):
-        for file in files:
-            lower_file = file.lower()
-            if lower_file.endswith('.docx') or lower_file.endswith('.doc'):
-                word_files.append(os.path.join(root, file))
-            elif lower_file.endswith('.pdf'):
-                pdf_files.append(os.path.join(root, file))
+    for entry in _iter_files(input_dir, ('.docx', '.doc', '.pdf')):
+        if entry.name.lower().endswith('.pdf'):
+            pdf_files.append(entry.path)
+        else:
+            word_files.append(entry.path)
     
     # Dictionary to store project ID mappings
     project_id_mappings = {}
@@ -571,12 +1130,14 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
         print(f"No Word documents (.doc or .docx) found in {input_dir}")
         # Even if no Word files are found, we'll still copy PDFs
     else:
-        # Get maximum number of workers for optimal performance
-        # Use all available CPU cores
-        max_workers = os.cpu_count()
+        # Word instances are heavy, so use the conservative default unless overridden
+        max_workers = workers or get_optimal_workers()
         
         print(f"Found {len(word_files)} Word documents to convert")
-        print(f"Using Microsoft Word for conversion with {max_workers} worker processes")
+        if use_soffice:
+            print(f"Using LibreOffice for conversion with up to {SOFFICE_BATCH_SIZE} files per run")
+        else:
+            print(f"Using Microsoft Word for conversion with {max_workers} worker processes")
         
         # Initialize counters and timing
         start_time = time.time()
@@ -592,23 +1153,38 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
         total_files = len(word_files) + len(pdf_files)
         print(f"Total files to process: {total_files}")
         
+        # One pool for every batch: Word starts once per worker, not once per batch
+        word_pool = None if use_soffice else _word_pool(max_workers, country_mapping)
+        
         # Process in smaller batches to prevent memory issues
-        for i in range(0, len(word_files), batch_size):
-            batch = word_files[i:i+batch_size]
-            
-            print(f"\nProcessing batch {i//batch_size + 1} of {(len(word_files) + batch_size - 1) // batch_size} ({len(batch)} files)")
-            
-            # Clean up any existing Word processes before each batch
-            try:
-                subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
-                              stdout=subprocess.DEVNULL, 
-                              stderr=subprocess.DEVNULL)
-                time.sleep(1)  # Give system time to close Word
-            except:
-                pass
-                    
-            # Process the current batch
-            process_batch(batch, output_dir, input_dir, rename_with_pid, country_mapping)
+        try:
+            for i in range(0, len(word_files), batch_size):
+                batch = word_files[i:i+batch_size]
+                
+                print(f"\nProcessing batch {i//batch_size + 1} of {(len(word_files) + batch_size - 1) // batch_size} ({len(batch)} files)")
+                
+                if use_soffice:
+                    process_batch_with_soffice(batch, output_dir, input_dir, rename_with_pid, country_mapping)
+                else:
+                    # Word instances stay up across batches; hung ones are killed by the per-file watchdog
+                    try:
+                        process_batch(batch, output_dir, input_dir, rename_with_pid, executor=word_pool)
+                    except BrokenProcessPool:
+                        # A worker died and took the pool with it; start a fresh one
+                        logging.warning("Word worker pool broke, restarting it")
+                        word_pool.shutdown(wait=False)
+                        word_pool = _word_pool(max_workers, country_mapping)
+                        process_batch(batch, output_dir, input_dir, rename_with_pid, executor=word_pool)
+        finally:
+            # Safety net: make sure no Word instance outlives the conversion
+            if word_pool is not None:
+                word_pool.shutdown()
+                try:
+                    subprocess.run(["taskkill", "/f", "/im", "WINWORD.EXE"], 
+                                  stdout=subprocess.DEVNULL, 
+                                  stderr=subprocess.DEVNULL)
+                except:
+                    pass
         
         # Report results
         elapsed_time = time.time() - start_time
@@ -646,16 +1222,12 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
     
     print(f"\nAll operations complete. Output files saved to: {output_dir}")
     
-    # Verify the output directory contents
-    output_files = []
-    for root, _, files in os.walk(output_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                output_files.append(os.path.join(root, file))
+    # Verify the output directory contents (only the count is needed)
+    output_count = sum(1 for _ in _iter_files(output_dir, ('.pdf',)))
     
-    print(f"Actual PDF files in output directory: {len(output_files)}")
+    print(f"Actual PDF files in output directory: {output_count}")
     
-    if len(output_files) < (successful + copied_pdfs):
+    if output_count < (successful + copied_pdfs):
         print("WARNING: Some files may have been overwritten due to naming conflicts.")
     
     # Create a summary of project IDs found
@@ -687,16 +1259,12 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
     
     print(f"\nAll operations complete. Output files saved to: {output_dir}")
     
-    # Verify the output directory contents
-    output_files = []
-    for root, _, files in os.walk(output_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                output_files.append(os.path.join(root, file))
+    # Verify the output directory contents (only the count is needed)
+    output_count = sum(1 for _ in _iter_files(output_dir, ('.pdf',)))
     
-    print(f"Actual PDF files in output directory: {len(output_files)}")
+    print(f"Actual PDF files in output directory: {output_count}")
     
-    if len(output_files) < (successful + copied_pdfs):
+    if output_count < (successful + copied_pdfs):
         print("WARNING: Some files may have been overwritten due to naming conflicts.")
     
     # Create a summary of project IDs found
@@ -710,24 +1278,15 @@ def convert_folder_to_pdf(rename_with_pid=True, country_mapping=None):
             if len(project_ids) > 5:
                 print(f"  ...and {len(project_ids) - 5} more")
     
+    save_language_cache(output_dir)
+    
     return 0
 
-def verify_pdf(pdf_path):
-    """Verify that the created PDF is valid"""
-    try:
-        # Use PyPDF2 to check PDF validity
-        import PyPDF2
-        with open(pdf_path, 'rb') as file:
-            try:
-                pdf = PyPDF2.PdfReader(file)
-                # Try to access pages to ensure it's readable
-                num_pages = len(pdf.pages)
-                return True
-            except Exception:
-                return False
-    except ImportError:
-        # If PyPDF2 is not installed, just check file size
-        return os.path.getsize(pdf_path) > 100  # Assume valid if > 100 bytes
+def _get_reader(pdf_path):
+    """Open pdf_path with pypdf when it is installed, otherwise PyPDF2"""
+    if pypdf is not None:
+        return pypdf.PdfReader(pdf_path)
+    return PyPDF2.PdfReader(pdf_path)
 
 def is_file_locked(file_path):
     """Check if a file is locked (in use by another process)"""
@@ -739,25 +1298,26 @@ def is_file_locked(file_path):
 
 def get_optimal_workers():
     """
-    Determine the optimal number of worker threads for Word document conversion.
-    Returns a reasonable number based on CPU cores while avoiding overloading the system.
+    Determine the optimal number of worker processes for Word document conversion.
+    Word instances are limited by memory rather than cores, so the count
+    scales with available RAM, up to one per core and at most 16.
     
     Returns:
-        int: Number of worker threads to use
+        int: Number of worker processes to use
     """
     # Base calculation on CPU cores
     cpu_count = os.cpu_count() or 4  # Default to 4 if detection fails
     
-    # For Word document processing, using all cores can cause issues
-    # Word instances are memory-intensive, so we'll be conservative
-    
-    # Use half the cores, but at least 2 and at most 4
-    # This is a balanced approach for Word processing
-    workers = max(2, min(4, cpu_count // 2))
+    try:
+        # Each Word instance needs roughly 350MB while converting
+        available_gb = psutil.virtual_memory().available / (1024**3)
+        workers = min(cpu_count, max(2, int(available_gb / 0.35)))
+    except Exception:
+        # Without memory information, fall back to half the cores, at most 4
+        workers = max(2, min(4, cpu_count // 2))
     
-    # For systems with many cores, still cap at 4 Word instances
-    # to avoid overwhelming the system with Word processes
-    return workers
+    # Many more concurrent Word processes just contend for disk and COM
+    return min(workers, 16)
 
 def get_optimal_batch_size():
     """
@@ -794,6 +1354,9 @@ def parse_args():
     parser.add_argument('--output', '-o', help='Output directory for PDF files')
     parser.add_argument('--rename', '-r', action='store_true', help='Rename files with project IDs', default=True)
     parser.add_argument('--no-rename', action='store_false', dest='rename', help="Don't rename files with project IDs")
+    parser.add_argument('--pid-col', help='Spreadsheet column (name or number) with project IDs (default: guessed from headers)')
+    parser.add_argument('--country-col', help='Spreadsheet column (name or number) with countries (default: guessed from headers)')
+    parser.add_argument('--workers', '-w', type=int, help='Number of Word worker processes (default: based on available memory and CPU cores, at most 16)')
     return parser.parse_args()
 
 def normalize_path(path):
@@ -818,15 +1381,14 @@ def extract_project_id_from_filename(filename):
         The project ID if found, None otherwise
     """
     try:
-        # Regular expression pattern for project ID in filename
-        # Looks for P + 6 digits + (- or _)
-        pattern = r'P\d{6}[-_]'
-        
-        # Find all matches in the filename
-        matches = re.findall(pattern, filename)
-        if matches:
-            # Return the first match without the trailing - or _
-            return matches[0][:-1]
+        # Fixed-width shape, so jump between P's instead of running a regex:
+        # P + 6 digits + (- or _)
+        i = filename.find('P')
+        while 0 <= i < len(filename) - 7:
+            # isdecimal matches the same digits as the regex \d did
+            if filename[i+1:i+7].isdecimal() and filename[i+7] in '-_':
+                return filename[i:i+7]
+            i = filename.find('P', i + 1)
                 
         return None
         
@@ -834,51 +1396,334 @@ def extract_project_id_from_filename(filename):
         logging.error(f"Error processing filename {filename}: {str(e)}")
         return None
 
-def detect_language(pdf_path, pages_to_check=3):
+def _language_cache_key(pdf_path):
+    """
+    Build a cache key from a PDF's size, modification time and a hash of its
+    first 64 KB, so the key survives renames but not content changes.
+    """
+    stat = os.stat(pdf_path)
+    with open(pdf_path, 'rb') as file:
+        digest = hashlib.blake2b(file.read(65536), digest_size=16).hexdigest()
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{digest}"
+
+def _content_cache_key(pdf_path):
+    """
+    Build a cache key from a hash of the whole file, so identical re-exports
+    share a result even when their size/mtime key differs.
+    """
+    hasher = _content_hasher()
+    with open(pdf_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return f"content:{hasher.hexdigest()}"
+
+def _cached_language(pdf_path):
+    """
+    Look up a PDF's language, first by the cheap size/mtime key and only then
+    by hashing the whole file.
+    
+    Returns:
+        Tuple of (language suffix or None, cache keys to store a new result under)
+    """
+    keys = []
+    for make_key in (_language_cache_key, _content_cache_key):
+        try:
+            key = make_key(pdf_path)
+        except OSError:
+            continue
+        keys.append(key)
+        if key in _language_cache:
+            return _language_cache[key], keys
+    return None, keys
+
+def load_language_cache(output_dir):
+    """Load language results saved by a previous run into the in-memory cache"""
+    cache_path = os.path.join(output_dir, LANGUAGE_CACHE_FILENAME)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            _language_cache.update(json.load(f))
+        logging.info(f"Loaded {len(_language_cache)} cached language results from {cache_path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Could not read language cache {cache_path}: {str(e)}")
+
+def save_language_cache(output_dir):
+    """Persist the in-memory language cache so reruns can skip detection"""
+    cache_path = os.path.join(output_dir, LANGUAGE_CACHE_FILENAME)
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(_language_cache, f)
+    except Exception as e:
+        logging.warning(f"Could not write language cache {cache_path}: {str(e)}")
+
+def _file_signature(stat_result):
+    """(size, mtime_ns) of a file, enough to tell whether it changed since it was recorded"""
+    return [stat_result.st_size, stat_result.st_mtime_ns]
+
+def _mapping_digest(country_mapping):
+    """Hash of a country mapping, so a ledger written with a different spreadsheet is ignored"""
+    data = json.dumps(sorted(country_mapping.items())).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _record_renamed(path):
+    """Note that path already carries its country, so the final country pass can skip it"""
+    try:
+        _renamed_ledger[os.path.abspath(path)] = _file_signature(os.stat(path))
+    except OSError:
+        pass
+
+def _is_renamed(entry):
+    """True if a DirEntry was recorded as named with its country and hasn't changed since"""
+    signature = _renamed_ledger.get(os.path.abspath(entry.path))
+    if signature is None:
+        return False
+    try:
+        return signature == _file_signature(entry.stat())
+    except OSError:
+        return False
+
+def load_renamed_ledger(output_dir, country_mapping):
+    """Load the files a previous run named with their country, if it used the same mapping"""
+    ledger_path = os.path.join(output_dir, RENAMED_LEDGER_FILENAME)
+    try:
+        with open(ledger_path, 'r', encoding='utf-8') as f:
+            ledger = json.load(f)
+        # Ledgers from older versions are plain path lists without a mapping hash
+        if not isinstance(ledger, dict) or ledger.get('mapping') != _mapping_digest(country_mapping):
+            logging.info(f"Country mapping changed since {ledger_path} was written; checking every file")
+            return
+        for rel, signature in ledger['files'].items():
+            # Entries recorded in this run are newer than the saved ones
+            _renamed_ledger.setdefault(os.path.abspath(os.path.join(output_dir, rel)), signature)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Could not read rename ledger {ledger_path}: {str(e)}")
+
+def save_renamed_ledger(output_dir, country_mapping):
+    """Persist the rename ledger, with paths relative to the output folder"""
+    ledger_path = os.path.join(output_dir, RENAMED_LEDGER_FILENAME)
+    # Drop files that were since deleted or moved away so the ledger doesn't grow forever
+    for path in [path for path in _renamed_ledger if not os.path.exists(path)]:
+        del _renamed_ledger[path]
+    ledger = {
+        'mapping': _mapping_digest(country_mapping),
+        'files': {os.path.relpath(path, output_dir): signature for path, signature in sorted(_renamed_ledger.items())},
+    }
+    try:
+        with open(ledger_path, 'w', encoding='utf-8') as f:
+            json.dump(ledger, f)
+    except Exception as e:
+        logging.warning(f"Could not write rename ledger {ledger_path}: {str(e)}")
+
+def detect_language(pdf_path, pages_to_check=3, text=None):
     """
     Detect if a PDF document is primarily in English or not.
+    Results are cached by file content, so renamed or re-processed copies
+    of the same document are only analyzed once.
     
     Args:
         pdf_path: Path to the PDF file
         pages_to_check: Number of pages to analyze for language detection
+        text: Text already extracted by extract_project_id_with_text; avoids reopening the PDF
+        
+    Returns:
+        "EN" if English is detected, "NON" otherwise
+    """
+    language_suffix, keys = _cached_language(pdf_path)
+    if language_suffix is None:
+        if text is not None:
+            language_suffix = detect_language_from_text(text, pdf_path)
+        else:
+            language_suffix = _detect_language_uncached(pdf_path, pages_to_check)
+    
+    for key in keys:
+        _language_cache[key] = language_suffix
+    return language_suffix
+
+@lru_cache(maxsize=64)
+def _language_suffix(lang):
+    """Map a langdetect ISO code to the filename suffix"""
+    return "EN" if lang == "en" else "NON"
+
+def _detect_text_language(text):
+    """Detect the ISO language code of a block of text, or None if it can't be determined"""
+    global _fasttext_failed
+    model = None if _fasttext_failed else _get_fasttext_model()
+    if model is not None:
+        try:
+            # fastText predicts a single line; labels look like "__label__en"
+            labels, _ = model.predict(text.replace('\n', ' '), k=1)
+            return labels[0].split('__')[-1] if labels else None
+        except Exception as e:
+            # e.g. fastText's np.array(probs, copy=False) raises ValueError under numpy 2;
+            # the failure is not about this text, so fall through to the next detector
+            _fasttext_failed = True
+            logging.warning(f"fastText language detection failed, using the next detector: {str(e)}")
+    
+    if LanguageDetectorBuilder is not None:
+        language = _get_lingua_detector().detect_language_of(text)
+        return language.iso_code_639_1.name.lower() if language is not None else None
+    
+    # Detectors accumulate text, so each call gets a fresh one from the loaded factory
+    detector = _language_factory.create()
+    detector.append(text)
+    return detector.detect()
+
+def detect_language_from_text(text, pdf_path=None):
+    """
+    Detect if text extracted from a PDF is primarily in English or not.
+    
+    Args:
+        text: Text from the first pages of the document
+        pdf_path: Source of the text, used in log messages
         
     Returns:
         "EN" if English is detected, "NON" otherwise
     """
+    # If we have enough text to detect language
+    if len(text) > 100:
+        try:
+            # A dense first page can be far longer than detection needs
+            lang = _detect_text_language(text[:LANGUAGE_TEXT_LIMIT])
+        except LangDetectException:
+            lang = None
+        except Exception as e:
+            # Text the detector can't handle; never fail the file over it
+            logging.error(f"Error detecting language in {pdf_path}: {str(e)}")
+            return "NON"  # Default to non-English on error
+        if lang is None:
+            logging.warning(f"Could not detect language in {pdf_path}")
+            return "NON"  # Default to non-English if detection fails
+        return _language_suffix(lang)
+    else:
+        logging.warning(f"Not enough text for language detection in {pdf_path}")
+        return "NON"  # Default to non-English if not enough text
+
+class _EnoughText(Exception):
+    """Raised from a text visitor to stop extraction once enough text is collected"""
+
+def _extract_text_bounded(page, limit):
+    """Extract a page's text, abandoning the content stream once limit characters are collected"""
+    parts = []
+    collected = 0
+    
+    def collector(text, cm, tm, font_dict, font_size):
+        nonlocal collected
+        parts.append(text)
+        collected += len(text)
+        if collected > limit:
+            raise _EnoughText
+    
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            
-            # Limit the number of pages to check
-            pages_to_check = min(len(reader.pages), pages_to_check)
-            
-            # Concatenate text from multiple pages for better detection
-            all_text = ""
-            for page_num in range(pages_to_check):
-                page = reader.pages[page_num]
-                text = page.extract_text()
-                if text:
-                    all_text += text
-                    # Once we have a decent amount of text, we can stop
-                    if len(all_text) > 1000:
-                        break
-            
-            # If we have enough text to detect language
-            if len(all_text) > 100:
-                try:
-                    lang = detect(all_text)
-                    return "EN" if lang == "en" else "NON"
-                except LangDetectException:
-                    logging.warning(f"Could not detect language in {pdf_path}")
-                    return "NON"  # Default to non-English if detection fails
-            else:
-                logging.warning(f"Not enough text for language detection in {pdf_path}")
-                return "NON"  # Default to non-English if not enough text
+        page.extract_text(visitor_text=collector)
+    except _EnoughText:
+        pass
+    return "".join(parts)
+
+def _extract_text_first_pages(pdf_path, pages, limit=1000):
+    """
+    Yield the text of the first pages of a PDF, one page at a time.
+    Prefers pdftotext when installed, then pypdf, then PyPDF2.
+    The Python readers stop parsing once more than limit characters are collected.
+    """
+    if _PDFTOTEXT is not None:
+        try:
+            result = subprocess.run([_PDFTOTEXT, '-l', str(pages), '-enc', 'UTF-8', pdf_path, '-'],
+                                    capture_output=True, check=False, timeout=PDFTOTEXT_TIMEOUT_SEC)
+        except subprocess.TimeoutExpired:
+            logging.warning(f"pdftotext timed out on {pdf_path}, falling back to Python extraction")
+        else:
+            if result.returncode == 0:
+                # pdftotext ends every page with a form feed
+                yield from result.stdout.decode('utf-8', 'replace').split('\f')[:pages]
+                return
+            logging.warning(f"pdftotext failed on {pdf_path}, falling back to Python extraction")
+    
+    # Pages are extracted lazily, so callers can stop once they have enough text
+    reader = _get_reader(pdf_path)
+    for page in islice(reader.pages, pages):
+        text = _extract_text_bounded(page, limit)
+        limit -= len(text)
+        yield text
+        if limit < 0:
+            return
+
+def _detect_language_uncached(pdf_path, pages_to_check=3):
+    """Detect the language of a PDF without consulting the cache"""
+    try:
+        # Concatenate text from multiple pages for better detection
+        all_text = ""
+        for text in _extract_text_first_pages(pdf_path, pages_to_check):
+            if text:
+                all_text += text
+                # Once we have a decent amount of text, we can stop
+                if len(all_text) > 1000:
+                    break
+        
+        return detect_language_from_text(all_text, pdf_path)
                     
     except Exception as e:
         logging.error(f"Error detecting language in {pdf_path}: {str(e)}")
         return "NON"  # Default to non-English on error
 
+def _read_spreadsheet(spreadsheet_path, file_ext):
+    """Load a CSV or Excel file into a DataFrame with the fastest reader available"""
+    if file_ext == '.csv':
+        try:
+            from pyarrow import ArrowException
+        except ImportError:
+            ArrowException = ImportError
+        try:
+            # pyarrow's multithreaded parser is much faster on large files
+            return pd.read_csv(spreadsheet_path, engine='pyarrow', dtype_backend='pyarrow')
+        except (ImportError, ValueError, ArrowException) as e:
+            # Not installed, or an encoding or layout pyarrow doesn't handle
+            logging.info(f"pyarrow could not read {spreadsheet_path}, using the C parser: {str(e)}")
+            return pd.read_csv(spreadsheet_path, engine='c')
+    
+    return pd.read_excel(spreadsheet_path)
+
+def _resolve_column(df, column):
+    """Map a column given by name or by number to its name; None stays None"""
+    if column is None or column in df.columns:
+        return column
+    # Try to convert to integer if it's a number
+    try:
+        return df.columns[int(column)]
+    except (ValueError, IndexError):
+        return column  # Keep as given; reported as not found below
+
+def _guess_column(columns, pattern, exclude=None):
+    """Return the columns whose header matches pattern (case-insensitive), in order"""
+    return list(columns[columns.astype(str).str.contains(pattern, case=False, regex=True) & (columns != exclude)])
+
+def _clean_project_ids(values):
+    """Normalize a column of project IDs; returns (cleaned IDs, mask of usable rows)"""
+    project_ids = values.astype(str).str.strip()
+    
+    # Handle project IDs that may not start with 'P'
+    needs_prefix = ~project_ids.str.startswith('P') & project_ids.str.isdigit()
+    project_ids = project_ids.where(~needs_prefix, 'P' + project_ids)
+    
+    # Clean project ID to ensure it follows the P###### format
+    # Remove any non-alphanumeric characters
+    project_ids = project_ids.str.replace(_PID_CLEAN_RE, '', regex=True)
+    
+    # Skip empty values and make sure the rest match our expected format
+    valid = values.notna() & project_ids.str.match(_PID_MATCH_RE.pattern)
+    return project_ids, valid
+
+def _guess_pid_column(df):
+    """Return the first ID-like column that actually holds P###### values, or None"""
+    # 'Project ID' beats 'Project Name', so ID headers are tried before project ones
+    for pattern in ('id|pid', 'project'):
+        for column in _guess_column(df.columns, pattern):
+            if _clean_project_ids(df[column])[1].any():
+                return column
+    return None
+
 def load_project_country_mapping(spreadsheet_path, pid_column=None, country_column=None):
     """
     Load project ID to country mapping from a spreadsheet.
@@ -888,37 +1733,40 @@ def load_project_country_mapping(spreadsheet_path, pid_column=None, country_colu
         file_ext = os.path.splitext(spreadsheet_path)[1].lower()
         
         # Load the spreadsheet based on file type
-        if file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(spreadsheet_path)
-        elif file_ext == '.csv':
-            df = pd.read_csv(spreadsheet_path)
+        if file_ext in ['.xlsx', '.xls', '.csv']:
+            df = _read_spreadsheet(spreadsheet_path, file_ext)
         else:
             logging.error(f"Unsupported file format: {file_ext}")
             return {}
         
-        # Show the column names to the user if not specified
+        # Columns given by number or name (e.g. from --pid-col / --country-col)
+        pid_column = _resolve_column(df, pid_column)
+        country_column = _resolve_column(df, country_column)
+        
+        # Otherwise guess them from the headers
+        if pid_column is None:
+            pid_column = _guess_pid_column(df)
+        if country_column is None:
+            country_column = next(iter(_guess_column(df.columns, 'country|nation', exclude=pid_column)), None)
+        
         if pid_column is None or country_column is None:
+            # Ask only when someone is there to answer; a prompt would hang a headless run
+            if not sys.stdin.isatty():
+                logging.warning("Could not determine the project ID and country columns")
+                print("Warning: could not determine the project ID and country columns; pass --pid-col and --country-col")
+                return {}
+            
             print("\nAvailable columns in the spreadsheet:")
             for i, col in enumerate(df.columns):
                 print(f"{i}: {col}")
             
             if pid_column is None:
-                pid_column = input("\nEnter the number or name of the column containing Project IDs: ").strip()
-                # Try to convert to integer if it's a number
-                try:
-                    pid_column = int(pid_column)
-                    pid_column = df.columns[pid_column]
-                except ValueError:
-                    pass
+                pid_column = _resolve_column(df, input("\nEnter the number or name of the column containing Project IDs: ").strip())
             
             if country_column is None:
-                country_column = input("Enter the number or name of the column containing Countries: ").strip()
-                # Try to convert to integer if it's a number
-                try:
-                    country_column = int(country_column)
-                    country_column = df.columns[country_column]
-                except ValueError:
-                    pass  # Keep as string if not a valid integer
+                country_column = _resolve_column(df, input("Enter the number or name of the column containing Countries: ").strip())
+        
+        print(f"Using columns '{pid_column}' (project ID) and '{country_column}' (country)")
         
         # Ensure the columns exist
         if pid_column not in df.columns:
@@ -929,31 +1777,18 @@ def load_project_country_mapping(spreadsheet_path, pid_column=None, country_colu
             logging.error(f"Country column '{country_column}' not found in spreadsheet")
             return {}
         
-        # Initialize mapping dictionary
-        mapping = {}
+        # Build the mapping with column-wide string operations instead of iterrows
+        project_ids, valid = _clean_project_ids(df[pid_column])
+        countries = df[country_column].astype(str).str.strip()
+        valid &= df[country_column].notna() & (countries != '')
         
-        # Create the mapping
-        for _, row in df.iterrows():
-            project_id = str(row[pid_column]).strip()
-            country = str(row[country_column]).strip()
-            
-            # Skip empty values
-            if not project_id or not country or pd.isna(project_id) or pd.isna(country):
-                continue
-            
-            # Handle project IDs that may not start with 'P'
-            if project_id and not project_id.startswith('P') and project_id.isdigit():
-                project_id = f"P{project_id}"
-            
-            # Clean project ID to ensure it follows the P###### format
-            # Remove any non-alphanumeric characters
-            project_id = re.sub(r'[^P0-9]', '', project_id)
-            
-            # Make sure it matches our expected format
-            if re.match(r'P\d{6}', project_id):
-                mapping[project_id] = country
+        # Store the filename-safe form so lookups don't have to fix it per file
+        mapping = dict(zip(project_ids[valid], countries[valid].str.replace(" ", "_", regex=False)))
         
         print(f"Loaded {len(mapping)} project ID to country mappings")
+        if not mapping:
+            logging.warning(f"No P###### project IDs found in column '{pid_column}'")
+            print(f"Warning: no P###### project IDs found in column '{pid_column}'; check --pid-col")
         if mapping:
             print("Sample mapping entries:")
             sample = list(mapping.items())[:3]
@@ -967,6 +1802,31 @@ def load_project_country_mapping(spreadsheet_path, pid_column=None, country_colu
         print(f"Error loading spreadsheet: {str(e)}")
         return {}
 
+def _rename_noreplace(src, dst):
+    """
+    Rename src to dst, raising FileExistsError instead of replacing an existing dst.
+    Only atomic where renameat2 is available; see RENAME_NOREPLACE.
+    """
+    if _renameat2 is not None:
+        if _renameat2(_AT_FDCWD, os.fsencode(src), _AT_FDCWD, os.fsencode(dst), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (errno.EINVAL, errno.ENOSYS):
+            raise OSError(err, os.strerror(err), src, None, dst)
+        # Kernel or filesystem doesn't support the flag
+    # os.rename silently replaces dst on POSIX, so refuse up front
+    if os.path.lexists(dst):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), src, None, dst)
+    os.rename(src, dst)
+
+def _rename_planned(rename):
+    """Carry out one (old path, new path) rename; returns the error message or None"""
+    try:
+        _rename_noreplace(*rename)
+        return None
+    except Exception as e:
+        return str(e)
+
 def apply_country_mapping_to_existing_files(output_dir, country_mapping):
     """
     Brute force apply country mapping to all PDF files in the output directory
@@ -978,19 +1838,26 @@ def apply_country_mapping_to_existing_files(output_dir, country_mapping):
     
     print("\nPerforming final country mapping check on all files...")
     
+    # Files named with their country in this or an earlier run need no check,
+    # unless they changed since or the mapping did
+    load_renamed_ledger(output_dir, country_mapping)
+    
     # Find all PDF files in the output directory
     pdf_files = []
-    for root, _, files in os.walk(output_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                pdf_files.append(os.path.join(root, file))
+    for entry in _iter_files(output_dir, ('.pdf',)):
+        if not _is_renamed(entry):
+            pdf_files.append(os.path.abspath(entry.path))
     
     if not pdf_files:
-        print("No PDF files found in output directory.")
+        print("No PDF files left to check in output directory.")
+        save_renamed_ledger(output_dir, country_mapping)
         return 0
     
-    # Initialize counter (was missing in original code)
-    updated_count = 0
+    # First pass: plan every rename without touching the disk. Names are reserved
+    # in per-directory sets (old names stay reserved too), so no two renames
+    # can target the same file and none can land on a file still being moved
+    rename_plan = []
+    listings = {}
     
     with tqdm(total=len(pdf_files), unit="file", desc="Checking files") as pbar:
         for pdf_file in pdf_files:
@@ -998,62 +1865,64 @@ def apply_country_mapping_to_existing_files(output_dir, country_mapping):
             dirname = os.path.dirname(pdf_file)
             
             # Extract project ID from filename using regex
-            match = re.search(r'(P\d{6})', filename)
+            match = _PID_BARE_RE.search(filename)
             if match:
                 project_id = match.group(1)
                 
                 # Check if this project ID has a country mapping
-                if project_id in country_mapping:
-                    country = country_mapping[project_id].replace(" ", "_")
+                country = country_mapping.get(project_id)
+                if country:
+                    # Parse the name once: "P123456_EN_01.pdf" -> ["P123456", "EN", "01"], "pdf"
+                    stem, _, ext = filename.rpartition('.')
+                    parts = stem.split('_')
                     
-                    # Check if country is already in the filename
-                    if country not in filename:
-                        # Get all parts of the filename
-                        if "_" in filename:
-                            parts = filename.split('_')
+                    # Only names that start with the project ID get the country
+                    if parts[0] == project_id:
+                        # The country belongs right after the project ID, so only that
+                        # slot is compared (countries may contain underscores themselves)
+                        country_slot = stem[len(project_id) + 1:]
+                        if country_slot == country or country_slot.startswith(f"{country}_"):
+                            _record_renamed(pdf_file)
                         else:
-                            # Handle case where there's no underscore (just "P123456.pdf")
-                            parts = [filename[:-4]]  # Remove .pdf
-                            
-                        # Check if project ID is the first part 
-                        if parts[0] == project_id:
                             # Create new filename with country inserted after project ID
-                            if len(parts) > 1:
-                                new_parts = [parts[0], country] + parts[1:]
-                                new_filename = "_".join(new_parts)
-                            else:
-                                new_filename = f"{project_id}_{country}.pdf"
+                            new_parts = [project_id, country] + parts[1:]
+                            new_filename = f"{'_'.join(new_parts)}.{ext}"
                             
-                            new_path = os.path.join(dirname, new_filename)
+                            names = _dir_names(listings, dirname)
                             
-                            # Handle duplicate filenames
+                            # Handle duplicate filenames: add a counter before the
+                            # extension, replacing one the name already has
+                            if len(new_parts) > 2 and new_parts[-1].isdigit():
+                                new_parts.pop()
                             counter = 1
-                            while os.path.exists(new_path) and new_path != pdf_file:
-                                if len(parts) > 1 and parts[-1].endswith('.pdf'):
-                                    # If the last part is the .pdf extension with possible counter
-                                    base = parts[-1].split('.')[0]
-                                    if base.isdigit():
-                                        # Already has counter, keep it
-                                        new_parts = [parts[0], country] + parts[1:]
-                                    else:
-                                        # Add counter before .pdf
-                                        new_parts = [parts[0], country] + parts[1:-1] + [f"{counter:02d}.pdf"]
-                                else:
-                                    new_parts = [parts[0], country] + parts[1:] + [f"{counter:02d}.pdf"]
-                                
-                                new_filename = "_".join(new_parts)
-                                new_path = os.path.join(dirname, new_filename)
+                            while new_filename in names and new_filename != filename:
+                                new_filename = f"{'_'.join(new_parts)}_{counter:02d}.{ext}"
                                 counter += 1
                             
-                            try:
-                                os.rename(pdf_file, new_path)
-                                logging.info(f"Added country to: {filename} -> {new_filename}")
-                                updated_count += 1
-                            except Exception as e:
-                                logging.error(f"Error renaming {pdf_file} to {new_path}: {str(e)}")
+                            names.add(new_filename)
+                            rename_plan.append((pdf_file, os.path.join(dirname, new_filename)))
             
             pbar.update(1)
     
+    # Second pass: the renames are independent syscalls, so run them concurrently
+    updated_count = 0
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as executor, \
+         tqdm(total=len(rename_plan), unit="file", desc="Renaming files") as pbar:
+        for (pdf_file, new_path), error in zip(rename_plan, executor.map(_rename_planned, rename_plan)):
+            if error is None:
+                # Per-file detail only at DEBUG; lazy arguments skip formatting otherwise
+                if debug_enabled:
+                    logging.debug("Added country to: %s -> %s", os.path.basename(pdf_file), os.path.basename(new_path))
+                updated_count += 1
+                _record_renamed(new_path)
+            else:
+                logging.error(f"Error renaming {pdf_file} to {new_path}: {error}")
+            pbar.update(1)
+    
+    save_renamed_ledger(output_dir, country_mapping)
+    logging.info("Added country to %d of %d planned renames", updated_count, len(rename_plan))
     print(f"Updated {updated_count} files with country information")
     return updated_count
 
@@ -1063,4 +1932,5 @@ if __name__ == "__main__":
         # TODO: Add command-line mode implementation
         pass
     else:
-        sys.exit(convert_folder_to_pdf(rename_with_pid=True)) 
\ No newline at end of file
+        sys.exit(convert_folder_to_pdf(rename_with_pid=True, workers=args.workers,
+                                       pid_column=args.pid_col, country_column=args.country_col)) 
\ No newline at end of file